@@ -0,0 +1,88 @@
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import fx
+from dateindex import to_days
+
+# --- 分析 cube ---
+# (期間, 類型, 分類) → TWD 合計，日 / 週 / 月 / 年 四種粒度同時維護。
+# 新增 / 刪除交易只加減它碰到的 bucket；畫圖用的 DataFrame 依版本號快取
+
+GRANULARITIES = {"日": "day", "週": "week", "月": "month", "年": "year"}
+
+
+def period_start(days, gran):
+    # 日數 ordinal → 該期間第一天的 ordinal
+    if gran == "day":
+        return days
+    if gran == "week":
+        return days - (days + 3) % 7  # 1970-01-01 是週四，週一 = 0
+    unit = "M" if gran == "month" else "Y"
+    return days.astype("datetime64[D]").astype(f"datetime64[{unit}]").astype("datetime64[D]").astype(np.int64)
+
+
+def _bucket_sums(df, gran, col):
+    if df.empty:
+        return {}
+    keys = pd.DataFrame({
+        "期間": period_start(to_days(df["日期"]), gran),
+        "類型": df["類型"].to_numpy(),
+        "分類": df["分類"].to_numpy(),
+        "金額": df[col].to_numpy(dtype=np.float64),
+    })
+    return keys.groupby(["期間", "類型", "分類"], sort=False)["金額"].sum().to_dict()
+
+
+class Cube:
+    # col：以哪一欄 TWD 金額彙總 (目前匯率 / 交易當日匯率)；輸出一律叫 金額(TWD)
+    def __init__(self, col=fx.TWD_COL):
+        self.col = col
+        self.token = uuid.uuid4().hex  # 給跨 session 的 st.cache_data 當 key
+        self.version = 0
+        self.cells = {g: {} for g in GRANULARITIES.values()}
+        self._frames = {}
+
+    @classmethod
+    def from_frame(cls, df, col=fx.TWD_COL):
+        cube = cls(col)
+        for g in cube.cells:
+            cube.cells[g] = _bucket_sums(df, g, col)
+        return cube
+
+    def add(self, df, sign=1):
+        if df.empty:
+            return
+        for g, cells in self.cells.items():
+            for key, amt in _bucket_sums(df, g, self.col).items():
+                cells[key] = cells.get(key, 0.0) + sign * amt
+            self._frames.pop(g, None)
+        self.version += 1
+
+    def remove(self, df):
+        self.add(df, sign=-1)
+
+    def frame(self, gran):
+        # 該粒度的長表 [期間, 類型, 分類, 金額(TWD)]，只有在該粒度被異動後才重建
+        if gran not in self._frames:
+            cells = self.cells[gran]
+            keys = list(cells)
+            df = pd.DataFrame(keys, columns=["期間", "類型", "分類"]) if keys else pd.DataFrame(columns=["期間", "類型", "分類"])
+            df[fx.TWD_COL] = np.fromiter(cells.values(), dtype=np.float64, count=len(cells))
+            df = df[np.abs(df[fx.TWD_COL]) > 1e-9]
+            df["期間"] = df["期間"].to_numpy(dtype=np.int64).astype("datetime64[D]")
+            self._frames[gran] = df.sort_values("期間", ignore_index=True)
+        return self._frames[gran]
+
+    def query(self, gran, start, end):
+        df = self.frame(gran)
+        lo = period_start(np.array([np.datetime64(start, "D")]).astype(np.int64), gran).astype("datetime64[D]")[0]
+        hi = np.datetime64(end, "D")
+        return df[(df["期間"] >= lo) & (df["期間"] <= hi)]
+
+    def span(self):
+        days = self.frame("day")["期間"]
+        if days.empty:
+            return None
+        return days.iloc[0].date(), days.iloc[-1].date()
@@ -0,0 +1,44 @@
+import numpy as np
+
+# --- 帳戶餘額彙總 ---
+# 維護 (帳戶, 類型) → 原幣金額合計；新增 / 修改 / 刪除交易時只加減異動的列，
+# 資產頁讀餘額是 O(帳戶數)
+
+
+def _sums(df):
+    if df.empty:
+        return {}
+    return df.groupby(["帳戶", "類型"], observed=True)["金額"].sum().to_dict()
+
+
+class BalanceBook:
+    def __init__(self, totals=None):
+        self.totals = dict(totals or {})
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(_sums(df))
+
+    def add(self, df, sign=1):
+        for key, amt in _sums(df).items():
+            self.totals[key] = self.totals.get(key, 0.0) + sign * amt
+
+    def remove(self, df):
+        self.add(df, sign=-1)
+
+    def update(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    def balance(self, account, opening=0.0):
+        return opening + self.totals.get((account, "收入"), 0.0) - self.totals.get((account, "支出"), 0.0)
+
+    def verify(self, df, tol=1e-6):
+        # 用一次 groupby 從頭重算，回傳不一致的 {(帳戶, 類型): (累計值, 重算值)}
+        fresh = _sums(df)
+        diff = {}
+        for key in set(self.totals) | set(fresh):
+            have, want = self.totals.get(key, 0.0), fresh.get(key, 0.0)
+            if not np.isclose(have, want, rtol=0, atol=tol * max(1.0, abs(want))):
+                diff[key] = (have, want)
+        return diff
@@ -0,0 +1,83 @@
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+import forecast
+import fx
+from benchmarks.synth import RATES, make_ledger
+
+# --- 蒙地卡羅預測 benchmark ---
+# python -m benchmarks.bench_forecast [--paths 10000] [--years 30]
+# 路徑 × 月向量化 (本 process / process pool) 對照逐路徑、逐月的純 Python 迴圈 (只跑少量路徑再換算)
+
+TODAY = datetime.date(2026, 10, 18)
+RECURRING = [
+    {"name": "薪水", "amt": 90000, "type": "收入", "cat": "薪資", "curr": "TWD", "freq": "月", "day": 5, "start": datetime.date(2024, 1, 1)},
+    {"name": "房租", "amt": 25000, "type": "支出", "cat": "居住", "curr": "TWD", "freq": "月", "day": 5, "start": datetime.date(2024, 1, 1)},
+    {"name": "保險", "amt": 30000, "type": "支出", "cat": "保險", "curr": "TWD", "freq": "年", "day": 5, "start": datetime.date(2024, 3, 1)},
+]
+LOANS = {"房貸": {"total": 10350000, "rate": 2.53, "years": 30, "grace_period": 2,
+                "start_date": datetime.date(2024, 1, 1), "remaining": 10350000}}
+
+
+def naive(inputs, paths, seed=0):
+    # 對照組：一條路徑一條路徑、一個月一個月算
+    rng = np.random.default_rng(seed)
+    a = forecast.ASSUME
+    loans = [(loan, m0, forecast.mortgage.schedule(loan)) for _, loan, m0 in inputs["loans"]]
+    out = np.zeros((paths, inputs["months"]))
+    for p in range(paths):
+        spend = 1 + rng.normal(a["spend_growth"], a["spend_growth_sd"]) / 100
+        earn = 1 + rng.normal(a["income_growth"], a["income_growth_sd"]) / 100
+        cash, stock, shock = inputs["cash"], inputs["stocks"], 0.0
+        bals = [float(loan["remaining"]) for loan, _, _ in loans]
+        for t in range(inputs["months"]):
+            h = rng.integers(len(inputs["inc_h"]))
+            cash += (inputs["inc_h"][h] + inputs["rec_inc"][t]) * earn ** ((t + 1) / 12)
+            cash -= (inputs["exp_h"][h] + inputs["rec_exp"][t]) * spend ** ((t + 1) / 12)
+            shock += rng.normal(0, a["rate_vol"] / 12 ** 0.5)
+            for k, (loan, m0, sched) in enumerate(loans):
+                m, n = m0 + t, len(sched["payment"])
+                if m < 0 or m >= n:
+                    continue
+                r = max(sched["rate"][m] + shock, 0) / 1200
+                pmt = bals[k] * r if m < sched["grace"] else (bals[k] * r / (1 - (1 + r) ** -(n - m)) if r > 0 else bals[k] / (n - m))
+                bals[k] += bals[k] * r - pmt
+                cash -= pmt
+            stock *= np.exp(rng.normal(0.004, 0.043))
+            out[p, t] = cash + stock + inputs["home"][t] - sum(bals)
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(argv):
+    paths = int(argv[argv.index("--paths") + 1]) if "--paths" in argv else 10_000
+    years = int(argv[argv.index("--years") + 1]) if "--years" in argv else 30
+    df = make_ledger(20_000, start=datetime.date(2020, 1, 1), days=2480)
+    df[fx.TWD_COL] = fx.to_twd(df["金額"], df["幣別"], RATES)
+    inputs, t_in = timed(lambda: forecast.build_inputs(df, 500_000, 300_000, RECURRING, LOANS, RATES, TODAY, years * 12))
+    print(f"paths={paths:,} months={years * 12}  inputs {t_in * 1000:.0f} ms")
+
+    serial, t_serial = timed(lambda: forecast.run(inputs, paths, seed=1, workers=1))
+    print(f"  vectorized (1 process)   {t_serial:8.2f} s")
+    workers = max(os.cpu_count() or 1, 2)
+    pooled, t_pool = timed(lambda: forecast.run(inputs, paths, seed=1, workers=workers))
+    print(f"  vectorized ({workers} processes) {t_pool:8.2f} s")
+    assert np.allclose(serial["net_worth"].to_numpy(), pooled["net_worth"].to_numpy())
+
+    k = max(paths // 100, 10)
+    _, t_naive = timed(lambda: naive(inputs, k))
+    print(f"  per-path loop ({k} paths)  {t_naive:8.2f} s → {t_naive * paths / k:.1f} s for {paths:,} "
+          f"({t_naive * paths / k / t_serial:.0f}× slower)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import fx
+from benchmarks.synth import RATES, make_ledger
+
+# --- 匯率換算 benchmark ---
+# python -m benchmarks.bench_fx [--with-apply]
+# 逐列 apply 在 1M 列要跑很久，預設只跑到 100k
+
+
+def convert_to_twd(amount, currency):
+    return amount * RATES.get(currency, 1.0)
+
+
+def bench(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def rate_history(seed=0):
+    # 2014–2025 每日匯率 (隨機漫步)
+    dates = pd.date_range("2014-01-01", "2025-12-31").to_numpy()
+    rng = np.random.default_rng(seed)
+    return fx.RateTable({c: (dates, RATES[c] * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates)))))
+                         for c in ("USD", "JPY", "VND", "EUR")})
+
+
+def main(argv):
+    with_apply = "--with-apply" in argv
+    table = rate_history()
+    print(f"{'rows':>10} {'apply(s)':>10} {'vector(s)':>10} {'rows/s':>14} {'speedup':>9}")
+    for n in (10_000, 100_000, 1_000_000):
+        df = make_ledger(n)
+        t_vec = bench(lambda: fx.to_twd(df['金額'], df['幣別'], RATES))
+        t_app = None
+        if with_apply or n <= 100_000:
+            t_app = bench(lambda: df.apply(lambda x: convert_to_twd(x['金額'], x['幣別']), axis=1), repeat=1)
+        app_s = f"{t_app:10.3f}" if t_app is not None else f"{'-':>10}"
+        speed = f"{t_app / t_vec:8.0f}x" if t_app is not None else f"{'-':>9}"
+        print(f"{n:>10,} {app_s} {t_vec:10.4f} {n / t_vec:14,.0f} {speed}")
+
+        # 快取欄位：匯率不變時只補新列
+        fx.fill_twd(df, RATES, full=True)
+        df.loc[len(df)] = df.iloc[0]
+        df.loc[len(df) - 1, fx.TWD_COL] = float("nan")
+        t_inc = bench(lambda: fx.fill_twd(df, RATES), repeat=1)
+        print(f"{'':>10} cached column refill (1 new row): {t_inc * 1000:.2f} ms")
+
+        # 歷史匯率 as-of：日期已是 datetime64 (欄位型別) 與 date 物件兩種輸入
+        d64 = pd.to_datetime(df['日期']).to_numpy()
+        t_asof = bench(lambda: table.to_twd(df['金額'], df['幣別'], d64, RATES))
+        t_obj = bench(lambda: table.to_twd(df['金額'], df['幣別'], df['日期'], RATES), repeat=1)
+        print(f"{'':>10} as-of historical: {t_asof * 1000:.1f} ms (datetime64), {t_obj * 1000:.1f} ms (date objects)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import importer
+import storage
+from benchmarks.synth import RATES, make_ledger
+
+# --- 批次匯入 benchmark ---
+# python -m benchmarks.bench_import [rows]
+# 產生一份銀行匯出格式的 CSV (正負號金額、無類型欄)，帳本裡先放前 5% 的列 (上一期對帳單重疊的部分)，
+# 走完整 pipeline 寫入暫存 SQLite；匯入筆數必須剛好是其餘 95%
+
+MAPPING = {"日期": "交易日期", "帳戶": "帳號", "分類": "摘要", "金額": "金額", "幣別": "幣別", "備註": "說明"}
+
+
+def write_statement(path, n):
+    df = make_ledger(n, seed=1)
+    sign = np.where(df["類型"] == "支出", -1, 1)
+    out = df.rename(columns={"日期": "交易日期", "帳戶": "帳號", "分類": "摘要", "備註": "說明"})
+    out["金額"] = df["金額"] * sign
+    out.drop(columns=["類型"]).to_csv(path, index=False)
+    return df
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    tmp = tempfile.mkdtemp()
+    csv_path = os.path.join(tmp, "statement.csv")
+    t0 = time.perf_counter()
+    df = write_statement(csv_path, n)
+    print(f"synthetic CSV: {n:,} rows, {os.path.getsize(csv_path) / 1e6:.1f} MB ({time.perf_counter() - t0:.1f}s to write)")
+
+    store = storage.Store(os.path.join(tmp, "bench.db")).for_user("bench")
+    store.append_frame(df.iloc[:n // 20])
+    existing = store.load_ledger()
+
+    def progress(stats):
+        print(f"\r  {stats['rows']:>10,} rows  {stats['rows_per_sec']:>10,.0f} rows/s", end="")
+
+    stats = importer.run(csv_path, MAPPING, {"類型": ""}, RATES, existing, store.append_frame, progress=progress)
+    print()
+    for k, v in stats.items():
+        print(f"  {k:>13}: {v:,.2f}" if isinstance(v, float) else f"  {k:>13}: {v:,}")
+    assert (stats["imported"], stats["duplicates"]) == (n - n // 20, n // 20), stats
+
+    # 同一份檔案再匯一次：應全部被去重
+    again = importer.run(csv_path, MAPPING, {"類型": ""}, RATES, store.load_ledger(), store.append_frame)
+    print(f"  re-import: {again['imported']:,} imported, {again['duplicates']:,} duplicates, {again['rows_per_sec']:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
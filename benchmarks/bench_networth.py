@@ -0,0 +1,61 @@
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import networth
+import storage
+
+# --- 淨資產時間序列 benchmark ---
+# python -m benchmarks.bench_networth
+# 載入快照 vs 從帳本全部重算、新增一筆 (資料庫 + 記憶體) 的增量成本、產生每日序列的時間
+
+
+def make_ledger(n, days, seed=0):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2010-01-01")
+    return pd.DataFrame({
+        "日期": (start + rng.integers(0, days, n)).astype(object),
+        "帳戶": rng.choice(["台幣薪轉", "越南薪資", "隨身皮夾", "信用卡"], n),
+        "類型": rng.choice(["支出", "支出", "收入", "轉帳"], n),
+        "分類": "餐飲", "金額": rng.integers(50, 5000, n).astype(float), "幣別": "TWD", "備註": "",
+    })
+
+
+ACCOUNTS = {a: {"balance": 0.0, "currency": "TWD"} for a in ["台幣薪轉", "越南薪資", "隨身皮夾", "信用卡"]}
+LOANS = {"房貸": {"total": 10350000, "rate": 2.53, "years": 30, "grace_period": 2,
+                "start_date": datetime.date(2012, 1, 1), "remaining": 10350000}}
+
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def main(argv):
+    end = datetime.date(2026, 10, 18)
+    db = storage.Store(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    print(f"{'rows':>9} {'load(ms)':>9} {'replay(ms)':>11} {'add mem(ms)':>12} {'add db(ms)':>11} {'series(ms)':>11}")
+    for n in (10_000, 100_000, 1_000_000):
+        store = db.for_user(f"bench{n}")
+        df = make_ledger(n, (end - datetime.date(2010, 1, 1)).days)
+        store.append_frame(df)
+        snap, t_load = timed(lambda: networth.Snapshots.from_store(store.load_snapshots()))
+        _, t_replay = timed(lambda: networth.Snapshots.from_frame(df))
+        # 回溯新增一筆 (一年前)：只重算該帳戶該日之後
+        one = make_ledger(1, 1, seed=n)
+        one["日期"] = [end - datetime.timedelta(days=365)]
+        _, t_add = timed(lambda: snap.add(one), repeat=20)
+        _, t_db = timed(lambda: store.append_frame(one), repeat=20)
+        _, t_series = timed(lambda: networth.daily(snap, ACCOUNTS, LOANS, {"TWD": 1.0}, end), repeat=5)
+        print(f"{n:>9,} {t_load * 1000:>9.1f} {t_replay * 1000:>11.1f} {t_add * 1000:>12.2f} {t_db * 1000:>11.2f} {t_series * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import portfolio
+from benchmarks.bench_fx import rate_history
+from benchmarks.synth import RATES
+
+# --- 股票估值 benchmark ---
+# python -m benchmarks.bench_portfolio [--tickers 500] [--years 20]
+# 產生 N 檔 × Y 年的每日收盤價 (parquet 與 csv 各一份)，比較讀檔與逐日估值；
+# 對照組：每檔各自 reindex / ffill 再加總 (pandas 逐檔迴圈)
+
+END = datetime.date(2025, 12, 31)
+
+
+def make_prices(path, n, years, ext, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(END.replace(year=END.year - years), END)
+    for i in range(n):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(dates))))
+        df = pd.DataFrame({"date": dates, "close": close.astype(np.float32)})
+        f = os.path.join(path, f"T{i:04d}{ext}")
+        df.to_parquet(f, index=False) if ext == ".parquet" else df.to_csv(f, index=False)
+    return [f"T{i:04d}" for i in range(n)]
+
+
+def make_holdings(tickers, years, lots=12, seed=0):
+    rng = np.random.default_rng(seed)
+    start = END.replace(year=END.year - years)
+    currs = ["TWD", "USD", "JPY"]
+    out = {}
+    for i, t in enumerate(tickers):
+        days = np.sort(rng.integers(0, 365 * years, lots))
+        qty = rng.integers(1, 100, lots).astype(float)
+        qty[1::3] *= -0.5  # 每三筆一筆賣出
+        out[t] = {"name": t, "currency": currs[i % 3],
+                  "lots": [{"date": start + datetime.timedelta(days=int(d)), "qty": float(q), "price": 100.0}
+                           for d, q in zip(days, qty)]}
+    return out
+
+
+def naive(holdings, path, rates):
+    # 對照：每檔讀價格、reindex 到每日、ffill，股數 cumsum，乘匯率後加總
+    first = min(l["date"] for h in holdings.values() for l in h["lots"])
+    days = pd.date_range(first, END)
+    total = pd.Series(0.0, index=days)
+    for t, h in holdings.items():
+        px = pd.read_csv(os.path.join(path, t + ".csv"), index_col=0, parse_dates=True)["close"]
+        px = px.reindex(days, method="ffill").fillna(100.0)
+        lots = pd.DataFrame(h["lots"])
+        qty = lots.groupby(pd.to_datetime(lots["date"]))["qty"].sum().reindex(days, fill_value=0).cumsum()
+        total += qty * px * rates.get(h["currency"], 1.0)
+    return total
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(argv):
+    n = int(argv[argv.index("--tickers") + 1]) if "--tickers" in argv else 500
+    years = int(argv[argv.index("--years") + 1]) if "--years" in argv else 20
+    root = tempfile.mkdtemp()
+    paths = {ext: os.path.join(root, ext[1:]) for ext in (".parquet", ".csv")}
+    for ext, path in paths.items():
+        os.makedirs(path)
+        tickers = make_prices(path, n, years, ext)
+    holdings = make_holdings(tickers, years)
+    n_lots = sum(len(h["lots"]) for h in holdings.values())
+    print(f"{n} tickers × {years} years, {n_lots:,} lots")
+
+    _, t_parquet = timed(lambda: portfolio.PriceTable.from_dir(tickers, paths[".parquet"]))
+    _, t_csv = timed(lambda: portfolio.PriceTable.from_dir(tickers, paths[".csv"]))
+    table, t_npy = timed(lambda: portfolio.PriceTable.from_dir(tickers, paths[".csv"]))
+    print(f"  read parquet            {t_parquet * 1000:8.0f} ms  ({len(table):,} prices)")
+    print(f"  read csv (first, parse) {t_csv * 1000:8.0f} ms")
+    print(f"  read csv (.npy cache)   {t_npy * 1000:8.0f} ms")
+
+    rate_table = rate_history()
+    pf, t_cur = timed(lambda: portfolio.Portfolio(holdings, table, RATES, end=END))
+    _, t_hist = timed(lambda: portfolio.Portfolio(holdings, table, RATES, rate_table, end=END))
+    print(f"  valuate (current fx)    {t_cur * 1000:8.0f} ms  ({len(pf.days):,} days)")
+    print(f"  valuate (daily fx)      {t_hist * 1000:8.0f} ms")
+    base, t_naive = timed(lambda: naive(holdings, paths[".csv"], RATES))
+    print(f"  naive per-ticker csv    {t_naive * 1000:8.0f} ms  (×{t_naive / (t_npy + t_cur):.1f} vs cached read + valuate)")
+    rel = np.abs(base.to_numpy() - pf.value).max() / np.abs(base.to_numpy()).max()
+    print(f"  max relative diff naive vs vector: {rel:.1e}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
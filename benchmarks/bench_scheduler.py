@@ -0,0 +1,54 @@
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import scheduler
+import storage
+
+# --- 固定收支排程 benchmark ---
+# python -m benchmarks.bench_scheduler
+# 首次補記 (多年 × 數百項目) 與平常啟動 (只補上次之後) 的產生 + 冪等寫入時間
+
+
+def make_items(n, start, seed=0):
+    rng = np.random.default_rng(seed)
+    freqs = rng.choice(["月", "月", "月", "年", "週"], n)
+    return [{"name": f"項目{i}", "amt": float(rng.integers(100, 30000)), "type": "支出", "cat": "訂閱", "curr": "TWD",
+             "freq": f, "day": int(rng.integers(0, 7)) if f == "週" else int(rng.integers(1, 32)),
+             "start": start, "end": None, "account": "台幣薪轉"} for i, f in enumerate(freqs)]
+
+
+LOANS = {"房貸": {"total": 10350000, "rate": 2.53, "years": 30, "grace_period": 2,
+                "start_date": datetime.date(2018, 1, 1), "remaining": 10350000, "autopay": "台幣薪轉"}}
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(argv):
+    today = datetime.date(2026, 10, 18)
+    db = storage.Store(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    print(f"{'items':>6} {'years':>6} {'rows':>8} {'generate(ms)':>13} {'post(ms)':>9} {'repost(ms)':>11} {'daily(ms)':>10}")
+    for n, years in ((100, 3), (300, 5), (500, 8)):
+        store = db.for_user(f"bench{n}")
+        items = make_items(n, today.replace(year=today.year - years))
+        batch, t_gen = timed(lambda: scheduler.catch_up(items, LOANS, {}, today))
+        (ids, _), t_post = timed(lambda: store.append_once(batch[storage.LEDGER_COLS], batch["key"].tolist()))
+        # 再跑一次：全部 key 已存在，什麼都不寫
+        (again, _), t_repost = timed(lambda: store.append_once(batch[storage.LEDGER_COLS], batch["key"].tolist()))
+        assert len(ids) == len(batch) and not again
+        # 平常啟動：水位是昨天
+        marks = {k: today - datetime.timedelta(days=1) for k in scheduler.targets(items, LOANS)}
+        _, t_daily = timed(lambda: scheduler.catch_up(items, LOANS, marks, today))
+        print(f"{n:>6} {years:>6} {len(batch):>8,} {t_gen * 1000:>13.1f} {t_post * 1000:>9.1f} {t_repost * 1000:>11.1f} {t_daily * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+import datetime
+import sys
+import time
+
+import numpy as np
+
+import schema
+from benchmarks.bench_search import make_notes
+from benchmarks.synth import make_ledger
+
+# --- 帳本型別 benchmark ---
+# python -m benchmarks.bench_schema [--rows 1000000]
+# 字串 / date 物件表示法 對照 category + datetime64：每列 bytes 與常見篩選的時間，兩邊結果必須相同
+
+LO, HI = datetime.date(2019, 1, 1), datetime.date(2019, 12, 31)
+FILTERS = {
+    "帳戶 == 隨身皮夾": lambda df, lo, hi: df["帳戶"] == "隨身皮夾",
+    "分類 in (餐飲, 交通)": lambda df, lo, hi: df["分類"].isin(["餐飲", "交通"]),
+    "日期 2019 整年": lambda df, lo, hi: (df["日期"] >= lo) & (df["日期"] <= hi),
+    "支出 & 幣別 VND & 日期": lambda df, lo, hi: (df["類型"] == "支出") & (df["幣別"] == "VND") & (df["日期"] >= lo),
+}
+
+
+def timed(fn, repeat=3):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def main(argv):
+    rows = int(argv[argv.index("--rows") + 1]) if "--rows" in argv else 1_000_000
+    df = make_ledger(rows)
+    df["備註"] = make_notes(rows)
+    new, t_type = timed(lambda: schema.typed(df.copy()), repeat=1)
+    old = schema.legacy(new)
+
+    m_old, m_new = schema.memory(old), schema.memory(new)
+    print(f"rows={rows:,}  typed() {t_type:.2f} s")
+    print(f"{'column':<8} {'legacy B/row':>13} {'typed B/row':>12}")
+    for col in m_new.index:
+        print(f"{col:<8} {m_old.at[col, 'bytes/列']:>13.1f} {m_new.at[col, 'bytes/列']:>12.1f}")
+    ratio = m_old.at["合計", "bytes/列"] / m_new.at["合計", "bytes/列"]
+    print(f"total {m_old.at['合計', 'bytes'] / 2**20:,.0f} MB → {m_new.at['合計', 'bytes'] / 2**20:,.0f} MB ({ratio:.1f}× smaller)")
+
+    # 舊表示法的日期欄是 date 物件，只能跟 date 比；新的跟 datetime64 比
+    lo64, hi64 = np.datetime64(LO), np.datetime64(HI)
+    print(f"{'filter':<24} {'hits':>8} {'legacy(ms)':>11} {'typed(ms)':>10} {'speedup':>8}")
+    for name, fn in FILTERS.items():
+        want, t_old = timed(lambda: fn(old, LO, HI))
+        got, t_new = timed(lambda: fn(new, lo64, hi64))
+        assert np.array_equal(want.to_numpy(), got.to_numpy()), name
+        print(f"{name:<24} {int(got.sum()):>8,} {t_old * 1000:>11.1f} {t_new * 1000:>10.1f} {t_old / t_new:>7.1f}×")
+
+    # 分組加總 (分析頁 / 預算的主要操作)
+    want, t_old = timed(lambda: old.groupby(["帳戶", "分類"])["金額"].sum())
+    got, t_new = timed(lambda: new.groupby(["帳戶", "分類"], observed=True)["金額"].sum())
+    assert np.allclose(want.to_numpy(), got.sort_index().to_numpy())
+    print(f"{'groupby 帳戶, 分類':<24} {len(got):>8,} {t_old * 1000:>11.1f} {t_new * 1000:>10.1f} {t_old / t_new:>7.1f}×")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
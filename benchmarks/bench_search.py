@@ -0,0 +1,87 @@
+import datetime
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import search
+from benchmarks.synth import make_ledger
+
+# --- 交易搜尋 benchmark ---
+# python -m benchmarks.bench_search [--rows 1000000]
+# 倒排索引 + facet bitmap 對照 pandas str.contains / isin 逐列掃描；兩邊結果必須相同
+
+SHOPS = ["河粉", "牛肉麵", "便利商店", "全聯", "家樂福", "捷運", "高鐵", "計程車", "電費", "水費", "瓦斯", "房租",
+         "咖啡", "早餐", "午餐", "晚餐", "火鍋", "壽司", "麵包", "水果", "藥局", "書店", "電影", "健身房", "保險"]
+WORDS = ["Netflix", "Spotify", "Grab", "Shopee", "Uber", "Apple", "Costco", "bonus", "Highlands", "Phở", "bánh", "mì"]
+
+
+def make_notes(n, seed=0):
+    # 1~3 個詞，三成帶一個發票號碼 (讓不同備註的數量接近真實帳本)
+    rng = np.random.default_rng(seed)
+    pool = np.array(SHOPS + WORDS + [s + w for s in SHOPS[:10] for w in ("店", "外送", "加點")])
+    k = rng.integers(1, 4, n)
+    picks = pool[rng.integers(0, len(pool), (n, 3))]
+    inv = rng.integers(10_000, 99_999, n)
+    return [" ".join(p[:m]) + (f" #{i}" if i % 10 < 3 else "") for p, m, i in zip(picks.tolist(), k, inv)]
+
+
+QUERIES = [
+    {"text": "河粉"},
+    {"text": "牛肉麵"},
+    {"text": "phở bánh"},
+    {"text": "net"},
+    {"text": "全聯", "facets": {"帳戶": ["台幣薪轉"]}},
+    {"facets": {"帳戶": ["隨身皮夾"], "分類": ["餐飲", "交通"]}},
+    {"text": "咖啡", "amount": (100, 500), "dates": (datetime.date(2019, 1, 1), datetime.date(2019, 12, 31))},
+]
+
+
+def naive(df, days, text="", facets=None, amount=(None, None), dates=(None, None)):
+    m = np.ones(len(df), dtype=bool)
+    for w in text.split():
+        m &= df["備註"].str.contains(w, case=False, regex=False).to_numpy()
+    for f, values in (facets or {}).items():
+        m &= df[f].isin(values).to_numpy()
+    if amount[0] is not None:
+        m &= (df["金額"] >= amount[0]).to_numpy() & (df["金額"] <= amount[1]).to_numpy()
+    if dates[0] is not None:
+        m &= (days >= np.datetime64(dates[0])) & (days <= np.datetime64(dates[1]))
+    return df.index.to_numpy()[m]
+
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def main(argv):
+    rows = int(argv[argv.index("--rows") + 1]) if "--rows" in argv else 1_000_000
+    df = make_ledger(rows)
+    df["備註"] = make_notes(rows)
+    df.index = np.arange(1, rows + 1)
+    days = pd.to_datetime(df["日期"]).to_numpy().astype("datetime64[D]")
+    idx, t_build = timed(lambda: search.SearchIndex.from_frame(df))
+    print(f"rows={rows:,}  build {t_build:.2f} s  tokens={len(idx.vocab):,}  postings={len(idx.postings):,}")
+
+    print(f"{'query':<58} {'hits':>8} {'index(ms)':>10} {'scan(ms)':>9}")
+    for q in QUERIES:
+        ids, t_idx = timed(lambda: idx.result_ids(idx.query(**q)), repeat=5)
+        want, t_scan = timed(lambda: naive(df, days, **q))
+        assert set(ids.tolist()) == set(want.tolist()), q
+        print(f"{str(q)[:58]:<58} {len(ids):>8,} {t_idx * 1000:>10.1f} {t_scan * 1000:>9.0f}")
+
+    # 新增一批：進 delta，不重建
+    new = make_ledger(1_000, seed=1)
+    new["備註"] = make_notes(1_000, seed=1)
+    new.index = np.arange(rows + 1, rows + 1_001)
+    _, t_add = timed(lambda: idx.add(new))
+    _, t_q = timed(lambda: idx.result_ids(idx.query("河粉")), repeat=5)
+    print(f"add 1,000 rows {t_add * 1000:.1f} ms  query after add {t_q * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
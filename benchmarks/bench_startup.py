@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# --- 啟動 / rerun 延遲 ---
+# python -m benchmarks.bench_startup
+# 每頁開一個新 process (cold start = 第一次 run，含 import)，再量 5 次 rerun 取最小值
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PAGES = ["帳本", "記帳", "分析", "資產", "設定"]
+
+_CHILD = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state["current_page"] = sys.argv[2]
+t0 = time.perf_counter(); at.run(); cold = time.perf_counter() - t0
+warm = []
+for _ in range(5):
+    t0 = time.perf_counter(); at.run(); warm.append(time.perf_counter() - t0)
+print(json.dumps({"cold": cold, "warm": min(warm), "error": bool(at.exception)}))
+"""
+
+
+def main():
+    env = dict(os.environ, ASSETFLOW_DB=os.path.join(tempfile.mkdtemp(), "bench.db"))
+    print(f"{'page':<6} {'cold(ms)':>10} {'rerun(ms)':>10}")
+    for page in PAGES:
+        out = subprocess.run([sys.executable, "-c", _CHILD, APP, page], env=env, capture_output=True, text=True)
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        flag = "  (exception)" if res["error"] else ""
+        print(f"{page:<6} {res['cold'] * 1000:10.0f} {res['warm'] * 1000:10.1f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
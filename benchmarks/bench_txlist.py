@@ -0,0 +1,54 @@
+import time
+
+import txlist
+from benchmarks.synth import make_ledger
+
+# --- 交易清單渲染 benchmark ---
+# python -m benchmarks.bench_txlist
+# 舊做法：iterrows + 每筆一段 HTML (= 每筆一個 Streamlit 元素)；
+# 新做法：一次組成單一 HTML 區塊；分頁後每次只組一頁
+
+
+def per_row(df):
+    out = []
+    for idx, row in df.iterrows():
+        icon = "🏠" if row['分類']=="房貸" else "🍜" if row['分類'] in ["餐飲","食品"] else "💰"
+        color_class = "c-green" if row['類型']=="收入" else "c-red"
+        sign = "+" if row['類型']=="收入" else "-"
+        out.append(f"""
+            <div class="tx-card">
+                <div class="tx-left">
+                    <div class="tx-icon">{icon}</div>
+                    <div>
+                        <div class="tx-title">{row['分類']}</div>
+                        <div class="tx-sub">{row['帳戶']} • {row['備註']}</div>
+                    </div>
+                </div>
+                <div class="tx-amt {color_class}">{sign} {row['幣別']} {row['金額']:,.0f}</div>
+            </div>
+            """)
+    return out
+
+
+def bench(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, res
+
+
+def main():
+    print(f"{'rows':>8} {'per-row(ms)':>12} {'elements':>9} {'bytes':>10} {'block(ms)':>10} {'bytes':>10} {'page(ms)':>9}")
+    for n in (100, 1_000, 10_000):
+        df = make_ledger(n)
+        t_old, old = bench(lambda: per_row(df))
+        t_new, new = bench(lambda: txlist.cards_html(df, show_date=True))
+        t_page, _ = bench(lambda: txlist.cards_html(txlist.page_slice(df, 0)[0], show_date=True))
+        print(f"{n:>8,} {t_old * 1000:12.2f} {len(old):>9,} {sum(len(s.encode()) for s in old):>10,} "
+              f"{t_new * 1000:10.2f} {len(new.encode()):>10,} {t_page * 1000:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
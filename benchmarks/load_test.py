@@ -0,0 +1,127 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# --- 多使用者負載測試 ---
+# python -m benchmarks.load_test --sessions 20 --users 4 --rows 20000
+# 1) N 個 AppTest session (= N 個瀏覽器分頁) 輪流 rerun，共用同一個 Store 連線池與快取；
+#    每個 session 綁一個使用者，只載入自己的分區。回報每 session 記憶體與 rerun 延遲
+#    (AppTest 不是 thread-safe，所以 session 在同一條 thread 交錯執行)
+# 2) N 條 thread 同時對連線池讀寫各自的分區，回報延遲與吞吐
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PAGES = ["帳本", "分析", "資產", "記帳"]
+
+
+def pct(xs):
+    ms = np.array(xs) * 1000
+    return f"p50 {np.percentile(ms, 50):.1f} ms  p95 {np.percentile(ms, 95):.1f} ms  max {ms.max():.1f} ms"
+
+
+def arrow_bytes():
+    # pandas 3 的字串欄位放在 Arrow 記憶體池，tracemalloc 看不到
+    try:
+        import pyarrow
+    except ImportError:
+        return 0
+    return pyarrow.total_allocated_bytes()
+
+
+def seed(store, users, rows):
+    from benchmarks.synth import make_ledger
+    for u in range(users):
+        store.for_user(f"user{u}").append_frame(make_ledger(rows, seed=u))
+
+
+def sessions_phase(args):
+    from streamlit.testing.v1 import AppTest
+
+    def open_session(i):
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.session_state["user"] = f"user{i % args.users}"
+        at.session_state["current_page"] = "帳本"
+        at.run()
+        return at
+
+    # 暖機：載入模組與共用資源，不算進每 session 記憶體
+    open_session(0)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0] + arrow_bytes()
+    t0 = time.perf_counter()
+    sessions = [open_session(i) for i in range(args.sessions)]
+    cold = (time.perf_counter() - t0) / args.sessions
+    per_session = (tracemalloc.get_traced_memory()[0] + arrow_bytes() - base) / args.sessions
+    tracemalloc.stop()
+
+    errors = [at.exception for at in sessions if at.exception]
+    lat = []
+    for k in range(args.reruns):
+        for i, at in enumerate(sessions):
+            at.session_state["current_page"] = PAGES[(i + k) % len(PAGES)]
+            t0 = time.perf_counter()
+            at.run()
+            lat.append(time.perf_counter() - t0)
+            if at.exception:
+                errors.append(at.exception)
+
+    print(f"[sessions] {args.sessions} sessions / {args.users} users / {args.rows:,} rows per user")
+    print(f"  memory per session: {per_session / 1e6:.2f} MB (tracemalloc + arrow)  first load: {cold * 1000:.0f} ms")
+    print(f"  rerun ({len(lat):,}): {pct(lat)}")
+    if errors:
+        print(f"  errors: {len(errors)} (first: {errors[0]})")
+
+
+def pool_phase(args, store):
+    from benchmarks.synth import make_ledger
+    batch = make_ledger(20, seed=99)
+
+    def worker(i):
+        us = store.for_user(f"user{i % args.users}")
+        reads, writes = [], []
+        for _ in range(args.reruns):
+            t0 = time.perf_counter()
+            us.load_items("rates")
+            us.load_ledger()
+            reads.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            us.append_frame(batch)
+            writes.append(time.perf_counter() - t0)
+        return reads, writes
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as ex:
+        results = list(ex.map(worker, range(args.sessions)))
+    wall = time.perf_counter() - t0
+    reads = [x for r, _ in results for x in r]
+    writes = [x for _, w in results for x in w]
+    print(f"[pool] {args.sessions} threads, pool size {store.pool_size}")
+    print(f"  load user slice ({len(reads):,}): {pct(reads)}")
+    print(f"  append 20 rows ({len(writes):,}): {pct(writes)}")
+    print(f"  throughput: {(len(reads) + len(writes)) / wall:.1f} ops/s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=20)
+    ap.add_argument("--users", type=int, default=4)
+    ap.add_argument("--rows", type=int, default=20_000, help="每個使用者的帳本筆數")
+    ap.add_argument("--reruns", type=int, default=5, help="每個 session 的 rerun 次數")
+    args = ap.parse_args()
+
+    os.environ["ASSETFLOW_DB"] = os.path.join(tempfile.mkdtemp(), "load.db")
+    import storage
+    store = storage.Store(os.environ["ASSETFLOW_DB"])
+    seed(store, args.users, args.rows)
+    sessions_phase(args)
+    pool_phase(args, store)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
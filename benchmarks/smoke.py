@@ -0,0 +1,105 @@
+import ast
+import builtins
+import glob
+import os
+import sys
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+# --- 冒煙測試 ---
+# python -m benchmarks.smoke
+# 1) 靜態檢查：每個模組裡讀到、但整個檔案都沒有綁定過的名稱 (按鈕裡的 NameError 頁面跑不到)
+# 2) 每一頁各跑一次 AppTest，不得有例外
+# 3) 按鈕後面才會跑到的路徑 (AppTest 沒辦法上傳檔案)：CSV 匯入直接在 AppTest 裡呼叫 importer.run → state.add_frame，
+#    筆數與餘額變化 (兩筆相同的晚餐都要進、轉帳不影響餘額) 要對，同一份再匯一次要全部略過
+# 任何一項失敗結束碼 1
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+PAGES = ["帳本", "記帳", "搜尋", "分析", "資產", "設定"]
+
+
+def undefined_names(path):
+    # 寬鬆版：檔案裡任何地方綁定過 (import / def / class / 指派 / 參數 / except as …) 都算有定義
+    tree = ast.parse(open(path, encoding="utf-8").read(), path)
+    bound = set(dir(builtins)) | {"__file__", "__name__"}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((a.asname or a.name).split(".")[0] for a in node.names)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+    return sorted({(n.lineno, n.id) for n in ast.walk(tree)
+                   if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load) and n.id not in bound})
+
+
+def _import_script(root):
+    import io
+    import sys
+
+    sys.path.insert(0, root)
+    import streamlit as st
+
+    import importer
+    import state
+
+    state.init_session()
+    before = len(st.session_state['data'])
+    bal = state.get_balances().balance("台幣薪轉")
+    csv = io.StringIO("日期,類型,金額,說明\n2026/01/02,,-1200,晚餐\n2026/01/03,,35000,薪水\n2026/01/02,,-1200,晚餐\n"
+                      "bad,,1,x\n2026/01/04,轉帳,5000,換匯\n")
+    runs = []
+    for _ in range(2):
+        csv.seek(0)
+        runs.append(importer.run(csv, {"日期": "日期", "類型": "類型", "金額": "金額", "備註": "說明"},
+                                 {"帳戶": "台幣薪轉", "幣別": "TWD", "類型": ""}, st.session_state['rates'],
+                                 st.session_state['data'], state.add_frame))
+    st.session_state['smoke'] = {"stats": runs[0], "again": runs[1], "added": len(st.session_state['data']) - before,
+                                 "balance": state.get_balances().balance("台幣薪轉") - bal}
+
+
+def check(name, at):
+    at.run()
+    if at.exception:
+        print(f"FAIL {name}: {at.exception[0].message}")
+        return False
+    print(f"ok   {name}")
+    return True
+
+
+def main():
+    os.environ["ASSETFLOW_DB"] = os.path.join(tempfile.mkdtemp(), "smoke.db")
+    ok = True
+    for path in sorted(glob.glob(os.path.join(ROOT, "*.py")) + glob.glob(os.path.join(ROOT, "views", "*.py"))):
+        for line, name in undefined_names(path):
+            print(f"FAIL {os.path.relpath(path, ROOT)}:{line}: undefined name {name}")
+            ok = False
+    for page in PAGES:
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.session_state["current_page"] = page
+        ok &= check(f"page {page}", at)
+
+    at = AppTest.from_function(_import_script, args=(ROOT,), default_timeout=60)
+    if check("import → state.add_frame", at):
+        res = at.session_state["smoke"]
+        stats = res["stats"]
+        got = (stats["imported"], stats["duplicates"], stats["rejected"], res["added"], res["balance"],
+               res["again"]["imported"], res["again"]["duplicates"])
+        if got != (4, 0, 1, 4, 32600.0, 0, 4):
+            print(f"FAIL import: {stats} again={res['again']} added={res['added']} balance change={res['balance']}")
+            ok = False
+    else:
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import analytics
+import balances
+import dateindex
+import fx
+import mortgage
+import schema
+import txlist
+from benchmarks.synth import ACCOUNTS, RATES, make_ledger
+from views.analysis import _specs
+
+# --- 回歸測試用 benchmark 組 ---
+# python -m benchmarks.suite [--sizes 10000,100000,1000000] [--save] [--tolerance 0.5] [--json out.json]
+# 每個熱點 (設定 → 效能剖析 裡的同名區段) 在 10k / 100k / 1M 列的合成帳本上各量幾次取最快。
+# --save 把這次結果存成 baseline (依機器而異，不進版控)；之後每次跑都和 baseline 比，
+# 慢超過 tolerance 且差距超過 NOISE 就標 REGRESSION，結束碼 1
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = [10_000, 100_000, 1_000_000]
+NOISE = 0.01  # 秒；太短的區段只看比例會一直誤報 (共用機器上同一段程式差 30~50% 很常見)
+LOAN = {"total": 10_350_000, "rate": 2.53, "years": 30, "grace_period": 2, "start_date": datetime.date(2024, 1, 1),
+        "remaining": 10_350_000, "prepayments": [{"date": datetime.date(2027, 6, 1), "amount": 500_000}],
+        "rate_changes": [{"date": datetime.date(2026, 1, 1), "rate": 2.8}]}
+
+
+def _ledger(df):
+    # 帳本：建日期索引、取一個月、畫第一頁卡片
+    idx = dateindex.DateIndex.from_frame(df, fx.TWD_COL)
+    ids = idx.ids_between(datetime.date(2020, 3, 1), datetime.date(2020, 3, 31), desc=True)
+    page, _ = txlist.page_slice(df.loc[ids], 0)
+    return txlist.cards_html(page, show_date=True)
+
+
+def _analysis(df):
+    # 分析 groupby：cube 建立 + 全期間月粒度查詢 + 圓餅 / 趨勢兩個 groupby
+    cube = analytics.Cube.from_frame(df)
+    start, end = cube.span()
+    out = cube.query("month", start, end)
+    pie = out[out["類型"] == "支出"].groupby("分類", as_index=False)[fx.TWD_COL].sum()
+    trend = out.groupby(["期間", "類型"], as_index=False)[fx.TWD_COL].sum()
+    return pie, trend
+
+
+def _mortgage(_):
+    # 房貸 試算：記帳頁逐月帶出本期應繳 (單月試算 + 攤還表查表)，與帳本大小無關
+    mortgage._CACHE.clear()
+    for m in range(360):
+        d = datetime.date(2024 + m // 12, m % 12 + 1, 5)
+        mortgage.calculate_mortgage_split(LOAN, d)
+        mortgage.split(LOAN, d)
+
+
+CASES = {
+    "帳本型別": lambda raw, df: schema.typed(raw.copy()),
+    "匯率換算": lambda raw, df: fx.fill_twd(df.copy(), RATES, full=True),
+    "資產 帳戶餘額": lambda raw, df: [balances.BalanceBook.from_frame(df).balance(a) for a in ACCOUNTS],
+    "分析 groupby": lambda raw, df: _analysis(df),
+    "帳本 索引+卡片": lambda raw, df: _ledger(df),
+}
+FIXED = {
+    "房貸 試算": _mortgage,
+    "分析 圖表": lambda df: _specs(*_analysis(df), "month"),
+}
+
+
+def best(fn, repeat):
+    t = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        t = min(t, time.perf_counter() - t0)
+    return t
+
+
+def run(sizes):
+    out = {}
+    for n in sizes:
+        raw = make_ledger(n)
+        raw.index = range(1, n + 1)
+        df = fx.fill_twd(schema.typed(raw.copy()), RATES, full=True)
+        repeat = 3 if n <= 100_000 else 2
+        for name, fn in CASES.items():
+            out[f"{name} @{n}"] = best(lambda: fn(raw, df), repeat)
+            print(f"  {name} @{n:,}: {out[f'{name} @{n}'] * 1000:.1f} ms", file=sys.stderr)
+    small = fx.fill_twd(schema.typed(make_ledger(10_000)), RATES, full=True)
+    for name, fn in FIXED.items():
+        fn(small)  # 先暖身 (altair 第一次要載入 schema)
+        out[name] = best(lambda: fn(small), 7)
+    return out
+
+
+def compare(now, base, tolerance):
+    rows, bad = [], []
+    for key, sec in now.items():
+        ref = base.get(key)
+        ratio = sec / ref if ref else None
+        flag = ratio is not None and ratio > 1 + tolerance and sec - ref > NOISE
+        rows.append((key, ref, sec, ratio, flag))
+        if flag:
+            bad.append(key)
+    return rows, bad
+
+
+def main(argv):
+    sizes = [int(s) for s in argv[argv.index("--sizes") + 1].split(",")] if "--sizes" in argv else SIZES
+    tolerance = float(argv[argv.index("--tolerance") + 1]) if "--tolerance" in argv else 0.5
+    now = run(sizes)
+    base = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            base = json.load(f)["results"]
+    rows, bad = compare(now, base, tolerance)
+
+    print(f"{'case':<24} {'baseline(ms)':>13} {'now(ms)':>10} {'ratio':>7}")
+    for key, ref, sec, ratio, flag in rows:
+        ref_s = f"{ref * 1000:.1f}" if ref else "-"
+        ratio_s = f"{ratio:.2f}" if ratio else "-"
+        print(f"{key:<24} {ref_s:>13} {sec * 1000:>10.1f} {ratio_s:>7}{'  REGRESSION' if flag else ''}")
+
+    report = {"run_at": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+              "machine": platform.node(), "tolerance": tolerance, "results": now, "regressions": bad}
+    if "--json" in argv:
+        with open(argv[argv.index("--json") + 1], "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    if "--save" in argv:
+        with open(BASELINE, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"baseline saved → {BASELINE}")
+    if bad and "--save" not in argv:
+        print(f"{len(bad)} regression(s): {', '.join(bad)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,30 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# --- 合成帳本 (benchmark 共用) ---
+
+ACCOUNTS = ["台幣薪轉", "越南薪資", "隨身皮夾"]
+CURRENCIES = ["TWD", "USD", "JPY", "VND", "EUR"]
+EXP_CATS = ["房貸", "餐飲", "交通", "購物", "居住", "娛樂", "醫療", "訂閱"]
+INC_CATS = ["薪資", "獎金", "股息", "副業"]
+NOTES = ["河粉", "咖啡", "午餐", "捷運", "Netflix", "房租", "超市", "晚餐 牛肉麵", "bonus", ""]
+RATES = {"TWD": 1.0, "USD": 32.5, "JPY": 0.21, "VND": 0.00128, "EUR": 35.2}
+
+
+def make_ledger(n, seed=0, start=datetime.date(2015, 1, 1), days=3650):
+    rng = np.random.default_rng(seed)
+    is_inc = rng.random(n) < 0.15
+    exp_cat = np.array(EXP_CATS, dtype=object)[rng.integers(0, len(EXP_CATS), n)]
+    inc_cat = np.array(INC_CATS, dtype=object)[rng.integers(0, len(INC_CATS), n)]
+    offsets = rng.integers(0, days, n)
+    return pd.DataFrame({
+        "日期": [start + datetime.timedelta(days=int(d)) for d in offsets],
+        "帳戶": np.array(ACCOUNTS, dtype=object)[rng.integers(0, len(ACCOUNTS), n)],
+        "類型": np.where(is_inc, "收入", "支出").astype(object),
+        "分類": np.where(is_inc, inc_cat, exp_cat),
+        "金額": rng.integers(10, 50000, n).astype(np.float64),
+        "幣別": np.array(CURRENCIES, dtype=object)[rng.integers(0, len(CURRENCIES), n)],
+        "備註": np.array(NOTES, dtype=object)[rng.integers(0, len(NOTES), n)],
+    })
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+# --- 日期索引 ---
+# 帳本依日期排序後保存 (日數 ordinal, id)，查某天 = searchsorted 切片；
+# 另存每日收入 / 支出 (TWD) 小計給週曆七天按鈕用；col 是哪一欄 TWD 金額 (由呼叫端給，這裡不依賴 fx)
+
+
+def to_days(dates):
+    # 日期欄 (datetime64 或 date 物件) → 1970-01-01 起算的日數 (int64)
+    if len(dates) == 0:
+        return np.empty(0, dtype=np.int64)
+    arr = np.asarray(dates)
+    if not np.issubdtype(arr.dtype, np.datetime64):
+        arr = pd.to_datetime(pd.Series(arr)).to_numpy()
+    return arr.astype("datetime64[D]").astype(np.int64)
+
+
+def day_ordinal(d):
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def _flows(df, col):
+    twd = df[col].to_numpy(dtype=np.float64)
+    typ = df["類型"].to_numpy()
+    return np.where(typ == "收入", twd, 0.0), np.where(typ == "支出", twd, 0.0)
+
+
+class DateIndex:
+    def __init__(self, days, ids, inc, exp, col):
+        self.col = col
+        # stable 排序：同一天內保留帳本原本順序 (新的在前)
+        order = np.argsort(days, kind="stable")
+        self.days = days[order]
+        self.ids = ids[order]
+        self._set_summary(self.days, inc[order], exp[order])
+
+    @classmethod
+    def from_frame(cls, df, col):
+        inc, exp = _flows(df, col)
+        return cls(to_days(df["日期"]), df.index.to_numpy(), inc, exp, col)
+
+    def _set_summary(self, days, inc, exp):
+        self.sum_days, inv = np.unique(days, return_inverse=True)
+        self.sum_inc = np.bincount(inv, weights=inc, minlength=len(self.sum_days))
+        self.sum_exp = np.bincount(inv, weights=exp, minlength=len(self.sum_days))
+
+    def __len__(self):
+        return len(self.days)
+
+    def ids_on(self, d):
+        o = day_ordinal(d)
+        lo = np.searchsorted(self.days, o, side="left")
+        hi = np.searchsorted(self.days, o, side="right")
+        return self.ids[lo:hi]
+
+    def ids_between(self, start, end, desc=False):
+        # [start, end] 含頭尾；desc=True 時日期新到舊，同一天內維持原順序
+        lo = np.searchsorted(self.days, day_ordinal(start), side="left")
+        hi = np.searchsorted(self.days, day_ordinal(end), side="right")
+        if desc:
+            return self.ids[lo:hi][np.argsort(-self.days[lo:hi], kind="stable")]
+        return self.ids[lo:hi]
+
+    def totals(self, first, n=1):
+        # 從 first 起連續 n 天的 (收入, 支出) 小計
+        want = day_ordinal(first) + np.arange(n)
+        pos = np.searchsorted(self.sum_days, want)
+        pos_c = np.minimum(pos, max(len(self.sum_days) - 1, 0))
+        if len(self.sum_days) == 0:
+            return np.zeros(n), np.zeros(n)
+        hit = self.sum_days[pos_c] == want
+        return np.where(hit, self.sum_inc[pos_c], 0.0), np.where(hit, self.sum_exp[pos_c], 0.0)
+
+    def add(self, df):
+        # 新交易插入到各自日期的最前面，不重排整本
+        if df.empty:
+            return
+        days = to_days(df["日期"])
+        ids = df.index.to_numpy()
+        inc, exp = _flows(df, self.col)
+        order = np.argsort(days, kind="stable")
+        days, ids, inc, exp = days[order], ids[order], inc[order], exp[order]
+        pos = np.searchsorted(self.days, days, side="left")
+        self.days = np.insert(self.days, pos, days)
+        self.ids = np.insert(self.ids, pos, ids)
+        self._set_summary(np.concatenate([self.sum_days, days]),
+                          np.concatenate([self.sum_inc, inc]),
+                          np.concatenate([self.sum_exp, exp]))
+
+    def remove(self, df):
+        if df.empty:
+            return
+        keep = ~np.isin(self.ids, df.index.to_numpy())
+        self.days = self.days[keep]
+        self.ids = self.ids[keep]
+        inc, exp = _flows(df, self.col)
+        self._set_summary(np.concatenate([self.sum_days, to_days(df["日期"])]),
+                          np.concatenate([self.sum_inc, -inc]),
+                          np.concatenate([self.sum_exp, -exp]))
@@ -0,0 +1,196 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+import fx
+import mortgage
+import scheduler
+from dateindex import to_days
+
+# --- 蒙地卡羅現金流 / 房貸預測 ---
+# 以「路徑 × 月」陣列一次模擬，第 0 個月是下個月：
+#   變動收支：歷史各分類月合計 (排除固定項目、自動扣款、房貸) 整月抽樣，保留分類之間的相關
+#   固定收支：排程往後展開，每月金額為確定值
+#   假設：每條路徑各抽一組支出 / 收入年成長率；房貸利率 = 攤還表利率 + 隨機漫步；股票為對數常態月報酬
+#   房貸：和攤還表同樣的邏輯逐月推進 (迴圈只跑月數，路徑向量化)，利率變動後以剩餘期數重算月付，每年可多還
+# 路徑分塊計算；大量路徑時分塊丟給 process pool，各塊用 SeedSequence.spawn 的獨立亂數
+
+PERCENTILES = (5, 25, 50, 75, 95)
+ASSUME = {"spend_growth": 2.0, "spend_growth_sd": 1.0, "income_growth": 2.0, "income_growth_sd": 1.5,
+          "rate_vol": 0.5, "stock_return": 5.0, "stock_vol": 15.0, "prepay": 0.0}
+CHUNK = 2500
+POOL_CELLS = 4_000_000  # 路徑 × 月超過這個數才值得開 process
+
+
+def _months(df):
+    return to_days(df["日期"]).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def history(df, today, lookback=36, col=fx.TWD_COL):
+    # 最近 lookback 個完整月份的變動收支：月 × (類型, 分類) 的 TWD 合計，沒有交易的月份補 0
+    cur = np.datetime64(today, "M").astype(np.int64)
+    month = _months(df)
+    note = df["備註"].fillna("").astype(str)
+    var = (df["類型"].isin(["收入", "支出"]) & (df["分類"] != "房貸")
+           & ~note.str.startswith(("固定:", "自動扣款:"))).to_numpy() & (month < cur) & (month >= cur - lookback)
+    sub = pd.DataFrame({"月": month[var], "類型": df["類型"].to_numpy()[var], "分類": df["分類"].to_numpy()[var],
+                        "金額": df[col].to_numpy(dtype=np.float64)[var]})
+    if sub.empty:
+        return pd.DataFrame(index=pd.Index([], name="月"))
+    table = sub.pivot_table(index="月", columns=["類型", "分類"], values="金額", aggfunc="sum", fill_value=0.0)
+    return table.reindex(np.arange(table.index.min(), cur), fill_value=0.0)
+
+
+def recurring_flows(recurring, rates, today, months):
+    # 固定收支往後 months 個月的每月 (收入, 支出) TWD
+    inc, exp = np.zeros(months), np.zeros(months)
+    first = np.datetime64(today, "M") + 1
+    items = [it for it in recurring if it.get("start")]
+    if not items or months <= 0:
+        return inc, exp
+    before = (first.astype("datetime64[D]") - 1).astype(object)
+    last = ((first + months).astype("datetime64[D]") - 1).astype(object)
+    rows = scheduler.catch_up(items, {}, {f"rec:{it['name']}": before for it in items}, last)
+    if len(rows):
+        t = _months(rows) - first.astype(np.int64)
+        twd = fx.to_twd(rows["金額"], rows["幣別"], rates)
+        typ = rows["類型"].to_numpy()
+        np.add.at(inc, t[typ == "收入"], twd[typ == "收入"])
+        np.add.at(exp, t[typ == "支出"], twd[typ == "支出"])
+    return inc, exp
+
+
+def build_inputs(df, cash, stocks, recurring, loans, rates, today, months=360, lookback=36, col=fx.TWD_COL):
+    # 模擬需要的一切都整理成 numpy / 純 dict (可以直接 pickle 給子 process)
+    hist = history(df, today, lookback, col)
+    level = hist.columns.get_level_values(0) if len(hist.columns) else pd.Index([])
+    rec_inc, rec_exp = recurring_flows(recurring, rates, today, months)
+    first = np.datetime64(today, "M") + 1
+    loan_list = []
+    home = np.zeros(months)
+    for name, loan in loans.items():
+        m0 = int((first - np.datetime64(loan["start_date"], "M")).astype(np.int64))
+        loan_list.append((name, dict(loan), m0))
+        home += np.where(m0 + np.arange(months) >= 0, float(loan["total"]), 0.0)
+    return {
+        "start": first, "months": months, "cash": float(cash), "stocks": float(stocks), "home": home,
+        "inc_h": hist.loc[:, level == "收入"].sum(axis=1).to_numpy() if len(hist) else np.zeros(1),
+        "exp_h": hist.loc[:, level == "支出"].sum(axis=1).to_numpy() if len(hist) else np.zeros(1),
+        "rec_inc": rec_inc, "rec_exp": rec_exp, "loans": loan_list,
+    }
+
+
+def _growth(rng, mu, sd, p, t):
+    # 每條路徑一個年成長率 (%) → 第 t 個月的累積倍數 (p × M)
+    g = np.maximum(rng.normal(mu, sd, p), -99.0) / 100
+    return np.exp(np.log1p(g)[:, None] * ((t + 1) / 12)[None, :])
+
+
+def _loan_paths(loan, m0, shock, prepay):
+    # shock：(p × M) 年利率加減 (百分點)。回傳每月繳款 (含多還) 與月底餘額，皆為 p × M
+    sched = mortgage.schedule(loan)
+    n, grace = len(sched["payment"]), sched["grace"]
+    p, months = shock.shape
+    bal = np.full(p, float(loan.get("remaining", loan["total"])))
+    pay = np.zeros((p, months))
+    out = np.zeros((p, months))
+    for t in range(months):
+        m = m0 + t
+        if m < 0:
+            continue
+        if m >= n:
+            pay[:, t] = bal
+            bal = np.zeros(p)
+            continue
+        r = np.maximum(sched["rate"][m] + shock[:, t], 0.0) / 1200
+        interest = bal * r
+        if m < grace:
+            pmt = interest
+        else:
+            rem = n - m
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pmt = np.where(r > 0, interest / (1 - (1 + r) ** -rem), bal / rem)
+        pmt = np.minimum(pmt, bal + interest)
+        bal = bal + interest - pmt
+        if prepay and t % 12 == 11:
+            extra = np.minimum(prepay, bal)
+            bal = bal - extra
+            pmt = pmt + extra
+        pay[:, t] = pmt
+        out[:, t] = bal
+    return pay, out
+
+
+def _simulate(inputs, paths, seed, assume):
+    # 一塊路徑：回傳 淨資產 (p × M, float32)、現金 (p × M, float32)、各房貸還清月 (L × p，未還清為 inf)
+    rng = np.random.default_rng(seed)
+    months = inputs["months"]
+    t = np.arange(months)
+    pick = rng.integers(0, len(inputs["inc_h"]), (paths, months))
+    spend = _growth(rng, assume["spend_growth"], assume["spend_growth_sd"], paths, t)
+    earn = _growth(rng, assume["income_growth"], assume["income_growth_sd"], paths, t)
+    flow = (inputs["inc_h"][pick] + inputs["rec_inc"]) * earn
+    flow -= (inputs["exp_h"][pick] + inputs["rec_exp"]) * spend
+    del pick, spend, earn
+
+    debt = np.zeros((paths, months))
+    payoff = np.full((len(inputs["loans"]), paths), np.inf)
+    if inputs["loans"]:
+        shock = np.cumsum(rng.normal(0.0, assume["rate_vol"] / np.sqrt(12), (paths, months)), axis=1)
+        for k, (_, loan, m0) in enumerate(inputs["loans"]):
+            pay, bal = _loan_paths(loan, m0, shock, assume["prepay"])
+            flow -= pay
+            debt += bal
+            done = (bal <= 0.5) & (m0 + t >= 0)
+            payoff[k] = np.where(done.any(axis=1), done.argmax(axis=1) + 1, np.inf)
+        del shock
+    cash = inputs["cash"] + np.cumsum(flow, axis=1)
+    del flow
+
+    mu = np.log1p(assume["stock_return"] / 100) / 12
+    sd = assume["stock_vol"] / 100 / np.sqrt(12)
+    stock = inputs["stocks"] * np.exp(np.cumsum(rng.normal(mu - sd * sd / 2, sd, (paths, months)), axis=1))
+    worth = cash + stock + inputs["home"] - debt
+    return worth.astype(np.float32), cash.astype(np.float32), payoff
+
+
+def _bands(values):
+    return pd.DataFrame(np.percentile(values, PERCENTILES, axis=0).T, columns=[f"P{q}" for q in PERCENTILES])
+
+
+def run(inputs, paths=10_000, seed=None, workers=None, **assume):
+    # workers=None：路徑 × 月夠大才自動用 process pool (核心數)；workers=1 一律在本 process 算
+    assume = {**ASSUME, **assume}
+    sizes = [min(CHUNK, paths - i) for i in range(0, paths, CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(sizes)) if paths * inputs["months"] >= POOL_CELLS else 1
+    parts = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(workers) as ex:
+                parts = list(ex.map(_simulate, [inputs] * len(sizes), sizes, seeds, [assume] * len(sizes)))
+        except (OSError, BrokenProcessPool):
+            parts = None
+    if parts is None:
+        parts = [_simulate(inputs, n, s, assume) for n, s in zip(sizes, seeds)]
+    worth = np.concatenate([p[0] for p in parts])
+    cash = np.concatenate([p[1] for p in parts])
+    payoff = np.concatenate([p[2] for p in parts], axis=1)
+
+    month = pd.DatetimeIndex((inputs["start"] + np.arange(inputs["months"])).astype("datetime64[D]"), name="月份")
+    worth_bands = _bands(worth).set_index(month)
+    cash_bands = _bands(cash).set_index(month)
+    names = [name for name, _, _ in inputs["loans"]]
+    if names:
+        payoff = np.vstack([payoff, payoff.max(axis=0)])
+        names.append("全部房貸")
+    # 還清月數用最接近的實際樣本 (未還清為 inf，不做內插)
+    months_left = pd.DataFrame(np.percentile(payoff, PERCENTILES, axis=1, method="nearest").T,
+                               index=pd.Index(names, name="房貸"), columns=[f"P{q}" for q in PERCENTILES])
+    months_left.insert(0, "期間內還清", np.isfinite(payoff).mean(axis=1))
+    return {"net_worth": worth_bands, "cash": cash_bands, "payoff": months_left,
+            "short": float((cash.min(axis=1) < 0).mean()), "paths": paths, "assume": assume}
@@ -0,0 +1,121 @@
+import glob
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import dateindex
+
+# --- 匯率換算 (向量化) ---
+# 以 categorical 幣別 codes 查匯率表，整欄一次換算，取代逐列 apply
+
+TWD_COL = "金額(TWD)"
+TWD_HIST_COL = "金額(TWD歷史)"
+RATES_DIR = os.environ.get("ASSETFLOW_RATES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rates"))
+
+
+def rates_key(rates):
+    # 匯率 dict 的不可變快照，用來判斷快取是否失效
+    return tuple(sorted(rates.items()))
+
+
+def rate_array(currencies, rates):
+    cat = pd.Categorical(currencies)
+    # 最後一格給 code = -1 (NaN / 未知幣別)；未知幣別一律視為 1.0
+    table = np.array([rates.get(c, 1.0) for c in cat.categories] + [1.0], dtype=np.float64)
+    return table[cat.codes]
+
+
+def to_twd(amounts, currencies, rates):
+    return np.asarray(amounts, dtype=np.float64) * rate_array(currencies, rates)
+
+
+def fill_twd(df, rates, full=False):
+    # full=True (匯率變動) 時整欄重算，否則只補新進、尚未換算的列
+    if df.empty:
+        df[TWD_COL] = pd.Series(dtype=np.float64)
+        return df
+    if full or TWD_COL not in df.columns:
+        df[TWD_COL] = to_twd(df['金額'], df['幣別'], rates)
+        return df
+    missing = df[TWD_COL].isna()
+    if missing.any():
+        df.loc[missing, TWD_COL] = to_twd(df.loc[missing, '金額'], df.loc[missing, '幣別'], rates)
+    return df
+
+
+# --- 歷史匯率 (as-of) ---
+# rates/<幣別>.csv，欄位 date,rate (1 單位外幣 = rate TWD)。
+# 每個幣別存一組排序好的 int32 日數 + float32 匯率；換算時 searchsorted 找「該日或之前最近的一筆」
+
+
+class RateTable:
+    def __init__(self, history=None):
+        self.token = uuid.uuid4().hex
+        self.days = {}
+        self.rates = {}
+        for curr, (dates, rates) in (history or {}).items():
+            d = dateindex.to_days(dates)
+            order = np.argsort(d, kind="stable")
+            self.days[curr] = d[order].astype(np.int32)
+            self.rates[curr] = np.asarray(rates, dtype=np.float32)[order]
+
+    @classmethod
+    def from_dir(cls, path=RATES_DIR):
+        history = {}
+        for f in sorted(glob.glob(os.path.join(path, "*.csv"))):
+            df = pd.read_csv(f, usecols=[0, 1])
+            df.columns = ["date", "rate"]
+            df = df.dropna()
+            if not df.empty:
+                history[os.path.splitext(os.path.basename(f))[0].upper()] = (df["date"].to_numpy(), df["rate"].to_numpy())
+        return cls(history)
+
+    def __len__(self):
+        return sum(len(d) for d in self.days.values())
+
+    def currencies(self):
+        return sorted(self.days)
+
+    def rate_vector(self, currencies, dates, fallback):
+        # 沒有歷史的幣別 (或 TWD) 用 fallback (目前匯率)；早於第一筆的日期用第一筆
+        cat = pd.Categorical(currencies)
+        out = rate_array(cat, fallback)
+        if not self.days or len(out) == 0:
+            return out
+        days = dateindex.to_days(dates)
+        codes = cat.codes
+        for k, curr in enumerate(cat.categories):
+            if curr not in self.days:
+                continue
+            m = codes == k
+            pos = np.searchsorted(self.days[curr], days[m], side="right") - 1
+            out[m] = self.rates[curr][np.maximum(pos, 0)]
+        return out
+
+    def to_twd(self, amounts, currencies, dates, fallback):
+        return np.asarray(amounts, dtype=np.float64) * self.rate_vector(currencies, dates, fallback)
+
+    def rates_on(self, d, fallback):
+        out = dict(fallback)
+        day = dateindex.to_days([d])[0]
+        for curr, days in self.days.items():
+            pos = np.searchsorted(days, day, side="right") - 1
+            out[curr] = float(self.rates[curr][max(pos, 0)])
+        return out
+
+
+def fill_twd_hist(df, table, rates, full=False):
+    # 同 fill_twd，換成交易當日匯率
+    if df.empty:
+        df[TWD_HIST_COL] = pd.Series(dtype=np.float64)
+        return df
+    if full or TWD_HIST_COL not in df.columns:
+        df[TWD_HIST_COL] = table.to_twd(df['金額'], df['幣別'], df['日期'], rates)
+        return df
+    missing = df[TWD_HIST_COL].isna()
+    if missing.any():
+        sub = df.loc[missing]
+        df.loc[missing, TWD_HIST_COL] = table.to_twd(sub['金額'], sub['幣別'], sub['日期'], rates)
+    return df
@@ -0,0 +1,174 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage import LEDGER_COLS
+
+# --- 批次匯入 (CSV / 銀行對帳單) ---
+# 分塊讀檔 → 欄位對應 → 正規化 → 去重 → 整塊寫入，每一段都是 generator，
+# 同一時間只有一個 chunk 在記憶體裡。
+# 去重是多重集合：內容相同的列依出現順序編號 (第 0、1、2… 筆)，鍵 = (內容, 編號)。
+# 同一天兩筆一樣的 ATM 提款都會匯入；整份檔案重匯一次則全部略過
+
+KEY_COLS = ["日期", "帳戶", "類型", "金額", "幣別", "備註"]
+
+CURRENCY_ALIASES = {
+    "NTD": "TWD", "NT$": "TWD", "NT": "TWD", "台幣": "TWD", "新台幣": "TWD",
+    "US$": "USD", "美元": "USD", "美金": "USD",
+    "日圓": "JPY", "日幣": "JPY", "円": "JPY",
+    "越南盾": "VND", "歐元": "EUR",
+}
+TYPE_ALIASES = {
+    "支出": "支出", "收入": "收入", "轉帳": "轉帳",
+    "debit": "支出", "withdrawal": "支出", "out": "支出",
+    "credit": "收入", "deposit": "收入", "in": "收入",
+    "transfer": "轉帳",
+}
+
+
+_KEY_FORMAT = {
+    "日期": lambda s: pd.to_datetime(pd.Series(s.to_numpy())).dt.strftime("%Y-%m-%d").to_numpy(),
+    "金額": lambda s: np.round(s.to_numpy(dtype=np.float64), 2),
+    "備註": lambda s: s.fillna("").astype(str).to_numpy(),
+}
+
+
+def row_keys(df):
+    # 內容 hash：KEY_COLS 的 64-bit hash (日期統一成字串、金額取到分)
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    keys = pd.DataFrame({c: _KEY_FORMAT.get(c, lambda s: s.astype(str).to_numpy())(df[c]) for c in KEY_COLS})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+class KeyCounts:
+    # 每個內容 hash 已出現幾次 (已排序的 hash + 次數)，檔案跨 chunk 接續編號
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def _get(self, keys):
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[pos] == keys, self.counts[pos], 0)
+
+    def number(self, keys):
+        # 每列是同內容的第幾筆 (0 起算)，並把這批算進去
+        order = np.argsort(keys, kind="stable")
+        sk = keys[order]
+        start = np.flatnonzero(np.r_[True, sk[1:] != sk[:-1]]) if len(sk) else np.zeros(0, dtype=np.int64)
+        grp = np.repeat(np.arange(len(start)), np.diff(np.r_[start, len(sk)]))
+        uniq = sk[start]
+        prior = self._get(uniq)
+        occ = np.empty(len(keys), dtype=np.int64)
+        occ[order] = prior[grp] + np.arange(len(sk)) - start[grp]
+        # 合併回計數表：同 hash 取新的次數
+        merged = np.concatenate([self.keys, uniq])
+        counts = np.concatenate([self.counts, prior + np.diff(np.r_[start, len(sk)])])
+        last = np.unique(merged[::-1], return_index=True)[1]
+        self.keys, self.counts = merged[::-1][last], counts[::-1][last]
+        return occ
+
+
+def occurrence_keys(df, counts):
+    # 去重鍵：(內容 hash, 同內容第幾筆) 再 hash 一次
+    h = row_keys(df)
+    pair = pd.DataFrame({"h": h, "n": counts.number(h)})
+    return pd.util.hash_pandas_object(pair, index=False).to_numpy()
+
+
+class KeyIndex:
+    # 已排序的 uint64 hash 陣列；查詢用 searchsorted
+    def __init__(self, keys=None):
+        self.keys = np.unique(keys) if keys is not None else np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def contains(self, keys):
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return self.keys[pos] == keys
+
+
+def read_chunks(src, chunksize=50_000, **read_kw):
+    read_kw.setdefault("dtype", str)
+    read_kw.setdefault("skipinitialspace", True)
+    yield from pd.read_csv(src, chunksize=chunksize, **read_kw)
+
+
+def map_columns(chunks, mapping, defaults):
+    # mapping: {帳本欄位: 檔案欄位}；沒對應到的欄位用 defaults 補
+    for chunk in chunks:
+        out = pd.DataFrame(index=chunk.index)
+        for col in LEDGER_COLS:
+            src = mapping.get(col)
+            out[col] = chunk[src] if src else defaults.get(col, "")
+        yield out
+
+
+def _amounts(s):
+    return pd.to_numeric(s.astype(str).str.replace(r"[,\s$]", "", regex=True), errors="coerce")
+
+
+def normalize(chunks, rates, stats):
+    for chunk in chunks:
+        amt = _amounts(chunk["金額"])
+        typ = chunk["類型"].astype(str).str.strip().str.lower().map(TYPE_ALIASES)
+        # 沒有類型欄 (或對不上) 時，依金額正負判斷：負數 = 支出。認得的類型 (含轉帳) 一律照用
+        typ = typ.fillna(pd.Series(np.where(amt < 0, "支出", "收入"), index=chunk.index))
+        curr = chunk["幣別"].astype(str).str.strip()
+        curr = curr.map(CURRENCY_ALIASES).fillna(curr.str.upper())
+        dates = pd.to_datetime(chunk["日期"], errors="coerce")
+
+        ok = amt.notna() & dates.notna() & curr.isin(list(rates))
+        stats["rejected"] += int((~ok).sum())
+        if not ok.any():
+            continue
+        yield pd.DataFrame({
+            "日期": dates[ok].dt.date,
+            "帳戶": chunk.loc[ok, "帳戶"].astype(str).str.strip(),
+            "類型": typ[ok],
+            "分類": chunk.loc[ok, "分類"].fillna("").astype(str).str.strip().replace("", "未分類"),
+            "金額": amt[ok].abs().astype(np.float64),
+            "幣別": curr[ok],
+            "備註": chunk.loc[ok, "備註"].fillna("").astype(str).str.strip(),
+        })
+
+
+def dedup(chunks, index, stats):
+    counts = KeyCounts()
+    for chunk in chunks:
+        # 帳本裡已有同內容、同編號的才略過 (檔案內的編號本來就不重複)
+        keys = occurrence_keys(chunk, counts)
+        fresh = ~index.contains(keys)
+        stats["duplicates"] += int((~fresh).sum())
+        if fresh.any():
+            yield chunk[fresh]
+
+
+def run(src, mapping, defaults, rates, existing, sink, chunksize=50_000, progress=None, **read_kw):
+    # sink(df) 負責整塊寫入；progress(stats) 每個 chunk 回報一次
+    stats = {"rows": 0, "imported": 0, "duplicates": 0, "rejected": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+    t0 = time.perf_counter()
+    index = KeyIndex(occurrence_keys(existing, KeyCounts()))
+
+    def counted(chunks):
+        for chunk in chunks:
+            stats["rows"] += len(chunk)
+            yield chunk
+
+    pipeline = dedup(normalize(map_columns(counted(read_chunks(src, chunksize, **read_kw)), mapping, defaults), rates, stats), index, stats)
+    for chunk in pipeline:
+        sink(chunk)
+        stats["imported"] += len(chunk)
+        stats["seconds"] = time.perf_counter() - t0
+        stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress:
+            progress(stats)
+    stats["seconds"] = time.perf_counter() - t0
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
@@ -0,0 +1,208 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+import profiling
+import storage
+
+# --- 房貸攤還表 ---
+# 依事件 (寬限期結束、利率調整、提前還款) 切段，每段用本息平均攤還的封閉解一次算完整段；
+# 與 calculate_mortgage_split 一致：提前還款後維持原年限、重算月付金。
+# 結果以貸款參數的 hash 快取
+
+_PARAMS = ("total", "rate", "years", "grace_period", "start_date", "prepayments", "rate_changes")
+_CACHE = OrderedDict()
+_CACHE_SIZE = 128
+CENT = 0.005  # 剩餘本金低於半分錢即視為 0
+
+
+# 單月試算 (依目前剩餘本金)：記帳時帶出本期應繳
+@profiling.timed("房貸 試算")
+def calculate_mortgage_split(loan_info, current_date):
+    total = loan_info['total']
+    remaining = loan_info['remaining']
+    rate_yr = loan_info['rate'] / 100
+    rate_mo = rate_yr / 12
+    start_date = loan_info['start_date']
+    
+    diff = relativedelta(current_date, start_date)
+    months_passed = diff.years * 12 + diff.months
+    
+    grace_months = loan_info['grace_period'] * 12
+    total_months = loan_info['years'] * 12
+    
+    if months_passed < 0: return 0, 0, 0, "未開始"
+    if months_passed >= total_months: return 0, 0, 0, "已結清"
+    
+    interest_payment = remaining * rate_mo
+    
+    if months_passed < grace_months:
+        return interest_payment, interest_payment, 0, f"寬限期 ({months_passed+1}/{grace_months})"
+    else:
+        rem_months = total_months - months_passed
+        if rem_months <= 0: rem_months = 1
+        if rate_mo > 0:
+            pmt = remaining * (rate_mo * (1 + rate_mo)**rem_months) / ((1 + rate_mo)**rem_months - 1)
+        else:
+            pmt = remaining / rem_months
+        principal_payment = pmt - interest_payment
+        return pmt, interest_payment, principal_payment, f"還款期 ({months_passed+1}/{total_months})"
+
+
+def loan_key(loan):
+    params = {k: loan.get(k) for k in _PARAMS}
+    return hashlib.sha1(storage.dumps(params).encode("utf-8")).hexdigest()
+
+
+def month_index(loan, d):
+    diff = relativedelta(d, loan["start_date"])
+    return diff.years * 12 + diff.months
+
+
+def _events(loan, n):
+    # 提前還款在該月正常繳款後扣本金；利率調整自該月起生效
+    prepay = np.zeros(n)
+    for p in loan.get("prepayments") or []:
+        m = month_index(loan, p["date"])
+        if 0 <= m < n:
+            prepay[m] += p["amount"]
+    rates = np.full(n, loan["rate"] / 100 / 12)
+    for c in sorted(loan.get("rate_changes") or [], key=lambda c: c["date"]):
+        m = month_index(loan, c["date"])
+        if m < n:
+            rates[max(m, 0):] = c["rate"] / 100 / 12
+    return prepay, rates
+
+
+def _build(loan):
+    n = int(loan["years"] * 12)
+    grace = min(int(loan["grace_period"] * 12), n)
+    prepay, rates = _events(loan, n)
+
+    cuts = {0, grace, n}
+    cuts.update((np.flatnonzero(prepay) + 1).tolist())
+    cuts.update((np.flatnonzero(np.diff(rates)) + 1).tolist())
+    cuts = sorted(c for c in cuts if 0 <= c <= n)
+
+    payment = np.zeros(n)
+    interest = np.zeros(n)
+    balance_start = np.zeros(n)
+    bal = float(loan["total"])
+    for s, e in zip(cuts[:-1], cuts[1:]):
+        if bal <= 0:
+            break
+        r = rates[s]
+        k = np.arange(e - s)
+        if s < grace:
+            # 寬限期：只繳息，本金不動
+            b = np.full(e - s, bal)
+            pmt = b * r
+            end = bal
+        else:
+            rem = n - s
+            if r > 0:
+                g = (1 + r) ** k
+                pmt_val = bal * r * (1 + r) ** rem / ((1 + r) ** rem - 1)
+                b = bal * g - pmt_val * (g - 1) / r
+                end = bal * (1 + r) ** (e - s) - pmt_val * ((1 + r) ** (e - s) - 1) / r
+            else:
+                pmt_val = bal / rem
+                b = bal - pmt_val * k
+                end = bal - pmt_val * (e - s)
+            pmt = np.full(e - s, pmt_val)
+        balance_start[s:e] = b
+        interest[s:e] = b * r
+        payment[s:e] = pmt
+        bal = max(end - prepay[e - 1], 0.0)
+        if bal < CENT:
+            bal = 0.0
+        prepay[e - 1] = min(prepay[e - 1], max(end, 0.0))
+    principal = payment - interest
+    balance = np.maximum(balance_start - principal - prepay, 0.0)
+    # 浮點誤差留下的零頭 (提前還清時常見 1e-9) 視為已還清
+    balance[balance < CENT] = 0.0
+    # 提前還清後的月份歸零
+    done = np.concatenate([[False], np.cumsum(balance[:-1] <= 0) > 0]) if n else np.zeros(0, bool)
+    for a in (payment, interest, principal, prepay, balance):
+        a[done] = 0.0
+    month = np.datetime64(loan["start_date"], "M") + np.arange(n)
+    sched = {"month": month, "payment": payment, "interest": interest, "principal": principal,
+             "prepay": prepay, "balance": balance, "rate": rates * 12 * 100, "grace": grace}
+    for v in sched.values():
+        if isinstance(v, np.ndarray):
+            v.flags.writeable = False
+    return sched
+
+
+@profiling.timed("房貸 攤還表")
+def schedule(loan):
+    # 回傳 {month, payment, interest, principal, prepay, balance, rate} 逐月陣列 (唯讀、快取共用)
+    key = loan_key(loan)
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+    sched = _CACHE[key] = _build(loan)
+    if len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return sched
+
+
+def split(loan, d):
+    # 與 calculate_mortgage_split 相同的 (月付, 利息, 本金, 狀態)，改查攤還表
+    sched = schedule(loan)
+    m = month_index(loan, d)
+    n = len(sched["payment"])
+    if m < 0: return 0, 0, 0, "未開始"
+    if m >= n or (m > 0 and sched["balance"][m - 1] <= 0): return 0, 0, 0, "已結清"
+    if m < sched["grace"]:
+        stat = f"寬限期 ({m+1}/{sched['grace']})"
+    else:
+        stat = f"還款期 ({m+1}/{n})"
+    return sched["payment"][m], sched["interest"][m], sched["principal"][m], stat
+
+
+def payoff_scenarios(loan, annual_prepay, from_date):
+    # 「每年多還 X」的還清月份：一次算一整批 X。
+    # 維持目前月付金不變，多還的部分縮短年限；每 12 個月為一段用封閉解推進，迴圈只跑年數
+    sched = schedule(loan)
+    n = len(sched["payment"])
+    x = np.atleast_1d(np.asarray(annual_prepay, dtype=np.float64))
+    m0 = min(max(month_index(loan, from_date), sched["grace"], 0), n - 1)
+    b0 = sched["balance"][m0 - 1] if m0 > 0 else float(loan["total"])
+    r = sched["rate"][m0] / 100 / 12
+    pmt = sched["payment"][m0]
+
+    bal = np.full(x.shape, float(b0))
+    paid = np.zeros(x.shape)
+    payoff = np.full(x.shape, -1, dtype=np.int64)
+    g12 = (1 + r) ** 12
+    for y in range((n - m0) // 12 + 2):
+        alive = payoff < 0
+        if not alive.any():
+            break
+        # 本段內第幾期還清 (本期後餘額 <= 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if r > 0:
+                k = np.ceil(np.log(pmt / (pmt - bal * r)) / np.log1p(r) - 1e-6)
+                k = np.where(pmt > bal * r, k, np.inf)
+            else:
+                k = np.ceil(bal / pmt - 1e-6)
+        hit = alive & (k <= 12)
+        kk = np.where(hit, k, 0)
+        # 最後一期只繳剩餘本息
+        end_k = bal * (1 + r) ** kk - pmt * (((1 + r) ** kk - 1) / r if r > 0 else kk)
+        paid = np.where(hit, paid + kk * pmt + end_k, paid)
+        payoff = np.where(hit, m0 + 12 * y + kk.astype(np.int64) - 1, payoff)
+
+        alive &= ~hit
+        end12 = bal * g12 - pmt * ((g12 - 1) / r if r > 0 else 12)
+        extra = np.minimum(x, np.maximum(end12, 0))
+        paid = np.where(alive, paid + 12 * pmt + extra, paid)
+        bal = np.where(alive, end12 - extra, bal)
+        cleared = alive & (bal <= 0)
+        payoff = np.where(cleared, m0 + 12 * y + 11, payoff)
+    months = np.datetime64(loan["start_date"], "M") + np.maximum(payoff, 0)
+    return {"prepay": x, "payoff_month": np.where(payoff >= 0, months, np.datetime64("NaT")),
+            "months_left": np.where(payoff >= 0, payoff - m0 + 1, -1), "interest": paid - b0}
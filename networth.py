@@ -0,0 +1,131 @@
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import dateindex
+import mortgage
+import storage
+
+# --- 淨資產時間序列 ---
+# 帳戶餘額 = 期初 + 快照累計。Snapshots 是資料庫 balance_snapshots 的記憶體副本：
+# 帳戶 → (排序好的日數, 當日淨流入, 累計)，新交易只從該日起往後重算該帳戶的累計。
+# 每日淨資產 = Σ 帳戶餘額 × 匯率 + 股票市值 + 房產 (房貸總額) − 房貸餘額 (攤還表)
+
+
+def _signed(df, sign=1.0):
+    return sign * df["金額"].to_numpy(dtype=np.float64) * df["類型"].map(storage.FLOW_SIGN).fillna(0.0).to_numpy()
+
+
+class Snapshots:
+    def __init__(self, accounts=None):
+        self.token = uuid.uuid4().hex
+        self.version = 0
+        self.accounts = dict(accounts or {})
+
+    @classmethod
+    def from_store(cls, df):
+        days = dateindex.to_days(df["date"])
+        flow, cum = df["flow"].to_numpy(dtype=np.float64), df["cum"].to_numpy(dtype=np.float64)
+        return cls({acct: (days[i], flow[i], cum[i]) for acct, i in df.groupby("account").indices.items()})
+
+    @classmethod
+    def from_frame(cls, df):
+        snap = cls()
+        snap.add(df)
+        return snap
+
+    def add(self, df, sign=1.0):
+        if df.empty:
+            return
+        g = pd.DataFrame({"account": df["帳戶"].to_numpy(), "day": dateindex.to_days(df["日期"]),
+                          "amount": _signed(df, sign)}).groupby(["account", "day"])["amount"].sum()
+        for acct, sub in g.groupby(level=0):
+            new_days = sub.index.get_level_values(1).to_numpy()
+            days, flow, cum = self.accounts.get(acct, (np.zeros(0, np.int64), np.zeros(0), np.zeros(0)))
+            all_days = np.union1d(days, new_days)
+            f = np.zeros(len(all_days))
+            f[np.searchsorted(all_days, days)] = flow
+            f[np.searchsorted(all_days, new_days)] += sub.to_numpy()
+            # 受影響的最早日期之前，位置與累計都不變
+            start = np.searchsorted(all_days, new_days[0])
+            c = np.empty(len(all_days))
+            c[:start] = cum[:start]
+            c[start:] = (cum[start - 1] if start else 0.0) + np.cumsum(f[start:])
+            self.accounts[acct] = (all_days, f, c)
+        self.version += 1
+
+    def remove(self, df):
+        self.add(df, sign=-1.0)
+
+    def balance(self, account, days):
+        # 各日 (日數) 收盤時的累計淨流入；第一筆之前為 0
+        if account not in self.accounts:
+            return np.zeros(len(days))
+        d, _, cum = self.accounts[account]
+        pos = np.searchsorted(d, days, side="right") - 1
+        return np.where(pos >= 0, cum[np.maximum(pos, 0)], 0.0)
+
+    def first_day(self):
+        firsts = [d[0] for d, _, _ in self.accounts.values() if len(d)]
+        return min(firsts) if firsts else None
+
+    def verify(self, df, tol=1e-6):
+        # 和帳本重算比對，回傳不一致的 {帳戶: 最大差額}
+        fresh = Snapshots.from_frame(df)
+        diff = {}
+        for acct in set(self.accounts) | set(fresh.accounts):
+            days = np.union1d(*(s.accounts.get(acct, (np.zeros(0, np.int64),))[0] for s in (self, fresh)))
+            gap = np.abs(self.balance(acct, days) - fresh.balance(acct, days))
+            if len(gap) and gap.max() > tol:
+                diff[acct] = float(gap.max())
+        return diff
+
+
+def loan_remaining(loan, days):
+    # 各日的房貸餘額：第 m 期在 (起始月 + m) 的扣款日繳，繳過 k 期後餘額 = 攤還表 balance[k-1]
+    sched = mortgage.schedule(loan)
+    start = loan["start_date"]
+    pay_day = int(loan.get("autopay_day", start.day))
+    d = np.asarray(days).astype("datetime64[D]")
+    month = d.astype("datetime64[M]")
+    m0 = month.astype("datetime64[D]")
+    month_len = ((month + 1).astype("datetime64[D]") - m0).astype(np.int64)
+    dom = (d - m0).astype(np.int64) + 1
+    paid = (month - np.datetime64(start, "M")).astype(np.int64) + (dom >= np.minimum(pay_day, month_len))
+    bal = sched["balance"]
+    rem = np.where(paid <= 0, float(loan["total"]), bal[np.clip(paid - 1, 0, len(bal) - 1)])
+    return np.where(d >= np.datetime64(start, "D"), rem, 0.0)
+
+
+def daily(snap, accounts, loans, rates, end, rate_table=None, stocks=None, start=None):
+    # 每日淨資產 (TWD)；rate_table 給定時帳戶逐日用歷史匯率
+    firsts = [dateindex.day_ordinal(l["start_date"]) for l in loans.values()]
+    if snap.first_day() is not None:
+        firsts.append(int(snap.first_day()))
+    if stocks is not None and len(stocks.days):
+        firsts.append(int(stocks.days[0].astype(np.int64)))
+    end_day = dateindex.day_ordinal(end)
+    first = dateindex.day_ordinal(start) if start else min(firsts + [end_day])
+    days = np.arange(first, end_day + 1)
+    dates = days.astype("datetime64[D]")
+
+    acct = np.zeros(len(days))
+    for name, info in accounts.items():
+        bal = info.get("balance", 0.0) + snap.balance(name, days)
+        curr = info.get("currency", "TWD")
+        acct += bal * (rates.get(curr, 1.0) if rate_table is None else rate_table.rate_vector([curr] * len(days), dates, rates))
+
+    home = np.zeros(len(days))
+    debt = np.zeros(len(days))
+    for loan in loans.values():
+        home += np.where(dates >= np.datetime64(loan["start_date"], "D"), float(loan["total"]), 0.0)
+        debt += loan_remaining(loan, days)
+
+    stock = np.zeros(len(days))
+    if stocks is not None and len(stocks.days):
+        pos = np.searchsorted(stocks.days.astype(np.int64), days, side="right") - 1
+        stock = np.where(pos >= 0, stocks.value[np.clip(pos, 0, len(stocks.value) - 1)], 0.0)
+
+    return pd.DataFrame({"帳戶": acct, "股票": stock, "房產": home, "房貸": -debt, "淨資產": acct + stock + home - debt},
+                        index=pd.DatetimeIndex(dates, name="日期"))
@@ -0,0 +1,244 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import dateindex
+import fx
+
+# --- 股票持倉估值 ---
+# 持倉以代號為單位存 {name, currency, lots: [{date, qty, price}]}，qty 正為買進、負為賣出。
+# 價格歷史放 prices/<代號>.parquet 或 .csv (date,close)，只讀持有的代號、只讀這兩欄。
+# 估值：建「代號 × 日」格子，價格散佈到格子後沿日 forward fill 取 as-of 收盤價，股數用 cumsum，
+# 乘上每日匯率後加總成每日市值；成本採平均成本法 (以交易日匯率換 TWD)
+
+PRICES_DIR = os.environ.get("ASSETFLOW_PRICES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "prices"))
+
+
+def _file(path, ticker):
+    for ext in (".parquet", ".csv"):
+        f = os.path.join(path, ticker + ext)
+        if os.path.exists(f):
+            return f
+    return None
+
+
+def signature(tickers, path=PRICES_DIR):
+    # 價格檔的 (代號, 修改時間)：檔案換了快取才失效
+    out = []
+    for t in sorted(tickers):
+        f = _file(path, t)
+        out.append((t, os.path.getmtime(f) if f else None))
+    return tuple(out)
+
+
+def read_prices(f):
+    # 欄位式讀取：parquet 只讀前兩欄 (memory map)；csv 解析一次後存成 .cache/<代號>.npy，之後 memory map 讀
+    if f.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(f, columns=pq.read_schema(f).names[:2], memory_map=True)
+        dates, close = table.column(0).to_numpy(), table.column(1).to_numpy()
+        ok = ~pd.isna(close)
+        return dateindex.to_days(dates[ok]), np.asarray(close[ok], dtype=np.float32)
+    cache = os.path.join(os.path.dirname(f), ".cache", os.path.splitext(os.path.basename(f))[0] + ".npy")
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(f):
+        arr = np.load(cache, mmap_mode="r")
+        return arr["day"], arr["close"]
+    df = pd.read_csv(f, usecols=[0, 1], parse_dates=[0], memory_map=True).dropna()
+    arr = np.empty(len(df), dtype=[("day", "<i4"), ("close", "<f4")])
+    arr["day"] = dateindex.to_days(df.iloc[:, 0])
+    arr["close"] = df.iloc[:, 1].to_numpy()
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        np.save(cache, arr)
+    except OSError:
+        pass
+    return arr["day"], arr["close"]
+
+
+class PriceTable:
+    # 所有代號的價格串成一條 (CSR)：offsets[i]:offsets[i+1] 是第 i 檔排序好的日數 / 收盤價
+    def __init__(self, history=None):
+        self.token = uuid.uuid4().hex
+        self.tickers = sorted(history or {})
+        days, close, offsets = [], [], [0]
+        for t in self.tickers:
+            d, p = history[t]
+            d = np.asarray(d, dtype=np.int64)
+            order = np.argsort(d, kind="stable")
+            days.append(d[order].astype(np.int32))
+            close.append(np.asarray(p, dtype=np.float32)[order])
+            offsets.append(offsets[-1] + len(d))
+        self.days = np.concatenate(days) if days else np.zeros(0, np.int32)
+        self.close = np.concatenate(close) if close else np.zeros(0, np.float32)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_dir(cls, tickers, path=PRICES_DIR):
+        history = {}
+        for t in tickers:
+            f = _file(path, t)
+            if f:
+                d, p = read_prices(f)
+                if len(d):
+                    history[t] = (d, p)
+        return cls(history)
+
+    def __len__(self):
+        return len(self.days)
+
+    def grid(self, tickers, days):
+        # tickers × days (排序好的日數) 的 as-of 收盤價 (float32)；沒有價格檔或早於第一筆的格子為 NaN
+        days = np.asarray(days, dtype=np.int64)
+        rows = [(r, self.index[t]) for r, t in enumerate(tickers) if t in self.index]
+        if not rows or not len(days):
+            return np.full((len(tickers), len(days)), np.nan, dtype=np.float32)
+        r, i = np.array(rows).T
+        src = np.concatenate([np.arange(self.offsets[k], self.offsets[k + 1]) for k in i])
+        row = np.repeat(r, self.offsets[i + 1] - self.offsets[i])
+        # 每筆價格落在「該日或之後第一格」，早於格子起點的都落在第 0 格 (_asof 只留最後一筆)
+        if days[-1] - days[0] == len(days) - 1:
+            col = np.maximum(self.days[src] - days[0], 0)  # 連續日格子：直接相減
+        else:
+            col = np.searchsorted(days, self.days[src])
+        keep = col < len(days)
+        src = src[keep]
+        idx = _asof(row[keep], col[keep], (len(tickers), len(days)))
+        return np.where(idx >= 0, self.close[src[np.maximum(idx, 0)]], np.float32(np.nan))
+
+
+def _asof(rows, cols, shape):
+    # rows / cols 依 (列, 時間) 排序；回傳每格「該格或之前最後一筆」在輸入中的位置，沒有為 -1。
+    # 位置沿時間遞增，所以 maximum.accumulate 就是逐列 forward fill
+    pos = np.arange(len(rows), dtype=np.int64)
+    last = np.r_[(rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1]), True]
+    idx = np.full(shape, -1, dtype=np.int64)
+    idx[rows[last], cols[last]] = pos[last]
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return idx
+
+
+def _lot_frame(holdings):
+    recs = [(t, lot["date"], float(lot["qty"]), float(lot["price"]), h.get("currency", "TWD"))
+            for t, h in holdings.items() for lot in h.get("lots", [])]
+    df = pd.DataFrame(recs, columns=["代號", "日期", "股數", "價格", "幣別"])
+    df["日數"] = dateindex.to_days(df["日期"]) if len(df) else np.zeros(0, np.int64)
+    return df.sort_values(["日數"], kind="stable", ignore_index=True)
+
+
+def _average_cost(lots, lot_fx):
+    # 平均成本法：賣出依當時平均成本沖銷，差額為已實現損益。逐筆交易 (非逐日) 迴圈
+    d_cost = np.zeros(len(lots))
+    d_real = np.zeros(len(lots))
+    held, cost = {}, {}
+    for k, (t, qty, price, rate) in enumerate(zip(lots["代號"].tolist(), lots["股數"].to_numpy(),
+                                                  lots["價格"].to_numpy(), lot_fx)):
+        h, c = held.get(t, 0.0), cost.get(t, 0.0)
+        if qty >= 0:
+            d_cost[k] = qty * price * rate
+        else:
+            sold = min(-qty, h)
+            out = c * sold / h if h > 0 else 0.0
+            d_cost[k] = -out
+            d_real[k] = sold * price * rate - out
+        held[t], cost[t] = h + qty, c + d_cost[k]
+    return d_cost, d_real, held, cost
+
+
+class Portfolio:
+    def __init__(self, holdings, prices, rates, rate_table=None, end=None):
+        # rate_table=None：全部用目前匯率；否則逐日查歷史匯率 (無歷史的幣別用目前匯率)
+        self.token = uuid.uuid4().hex
+        lots = _lot_frame(holdings)
+        self.tickers = sorted(holdings)
+        self.names = {t: holdings[t].get("name", t) for t in self.tickers}
+        self.currency = {t: holdings[t].get("currency", "TWD") for t in self.tickers}
+        end = dateindex.to_days([end or pd.Timestamp.today()])[0]
+        if lots.empty or lots["日數"].iloc[0] > end:
+            self.days = np.zeros(0, dtype="datetime64[D]")
+            self._empty()
+            return
+        first = lots["日數"].iloc[0]
+        day_nums = np.arange(first, end + 1)
+        self.days = day_nums.astype("datetime64[D]")
+        T, D = len(self.tickers), len(day_nums)
+        row = pd.Categorical(lots["代號"], categories=self.tickers).codes
+        col = lots["日數"].to_numpy() - first
+        live = col < D
+
+        # 股數：交易日加減後沿日累加
+        qty = np.zeros((T, D))
+        np.add.at(qty, (row[live], col[live]), lots["股數"].to_numpy()[live])
+        np.cumsum(qty, axis=1, out=qty)
+
+        # 價格：價格檔 as-of；沒有價格 (無檔或早於第一筆) 的格子用最近一次交易價
+        px = prices.grid(self.tickers, day_nums)
+        gap = np.isnan(px)
+        if gap.any():
+            order = np.lexsort((col, row))
+            order = order[live[order]]
+            idx = _asof(row[order], col[order], px.shape)
+            fill = gap & (idx >= 0)
+            px[fill] = lots["價格"].to_numpy()[order][idx[fill]]
+        np.nan_to_num(px, copy=False)
+
+        # 市值 = 股數 × 價格 × 匯率 (原地運算，不另開 T × D 陣列)；每個幣別一條逐日匯率
+        self.last_qty = qty[:, -1].copy()
+        self.last_px = px[:, -1].astype(np.float64)
+        value_t = qty
+        value_t *= px
+        del px
+        for c in sorted(set(self.currency.values())):
+            m = np.array([self.currency[t] == c for t in self.tickers])
+            value_t[m] *= (rates.get(c, 1.0) if rate_table is None
+                           else rate_table.rate_vector([c] * D, self.days, rates))
+
+        lot_fx = (rate_table.rate_vector(lots["幣別"], lots["日期"], rates) if rate_table is not None
+                  else fx.rate_array(lots["幣別"], rates))
+        d_cost, d_real, held, cost = _average_cost(lots, lot_fx)
+        cost_d = np.zeros(D)
+        real_d = np.zeros(D)
+        np.add.at(cost_d, col[live], d_cost[live])
+        np.add.at(real_d, col[live], d_real[live])
+
+        self.value = value_t.sum(axis=0)
+        self.cost = np.cumsum(cost_d)
+        self.realized = np.cumsum(real_d)
+        self.last_value = value_t[:, -1]
+        self.last_cost = np.array([cost.get(t, 0.0) for t in self.tickers])
+
+    def _empty(self):
+        T = len(self.tickers)
+        self.value = self.cost = self.realized = np.zeros(0)
+        self.last_qty = self.last_px = self.last_value = self.last_cost = np.zeros(T)
+
+    def daily(self):
+        return pd.DataFrame({"市值": self.value, "成本": self.cost, "未實現損益": self.value - self.cost,
+                             "已實現損益": self.realized}, index=pd.DatetimeIndex(self.days, name="日期"))
+
+    def value_on(self, d):
+        # d 當天收盤市值 (TWD)；早於第一筆交易為 0，晚於最後一天取最後一天
+        if not len(self.days):
+            return 0.0
+        pos = np.searchsorted(self.days, np.datetime64(d, "D"), side="right") - 1
+        return float(self.value[min(pos, len(self.value) - 1)]) if pos >= 0 else 0.0
+
+    def value_at(self, rates):
+        # 今天的持股 × 今天的股價，用指定匯率換算 (TWD)：資產頁「歷史匯率」只換匯率、不換數量
+        per_curr = np.array([rates.get(self.currency[t], 1.0) for t in self.tickers])
+        return float((self.last_qty * self.last_px * per_curr).sum()) if len(self.tickers) else 0.0
+
+    def summary(self):
+        df = pd.DataFrame({
+            "代號": self.tickers,
+            "名稱": [self.names[t] for t in self.tickers],
+            "持有股數": self.last_qty,
+            "目前市價": self.last_px,
+            "幣別": [self.currency[t] for t in self.tickers],
+            "市值(TWD)": self.last_value,
+            "成本(TWD)": self.last_cost,
+        })
+        df["損益(TWD)"] = df["市值(TWD)"] - df["成本(TWD)"]
+        return df[df["持有股數"] != 0].reset_index(drop=True)
@@ -0,0 +1,137 @@
+import datetime
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# --- 效能剖析 (--profile) ---
+# streamlit run app.py -- --profile  或  ASSETFLOW_PROFILE=1
+# 每次 rerun 記錄各區段耗時，結束時寫一行 log；第一次 rerun 另外標示 cold start
+# 也可以在 設定 → 效能剖析 執行中開關。各區段最近 HISTORY 次耗時 (ms) 留在 process 裡 (所有 session 共用)，
+# 設定頁畫分佈圖、匯出 JSON。關閉時 section / timed 只多一次判斷
+
+ENABLED = "--profile" in sys.argv or os.environ.get("ASSETFLOW_PROFILE") == "1"
+HISTORY = 500
+
+log = logging.getLogger("assetflow.profile")
+
+_PROCESS_T0 = time.perf_counter()
+_local = threading.local()  # Streamlit 每個 session 的 rerun 跑在自己的 thread
+_first = True
+_lock = threading.Lock()
+_samples = {}  # 區段名稱 → deque[ms]
+
+
+def _setup_log():
+    if log.handlers:
+        return
+    h = logging.StreamHandler()
+    h.setFormatter(logging.Formatter("%(asctime)s [profile] %(message)s"))
+    log.addHandler(h)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+def set_enabled(on):
+    global ENABLED
+    ENABLED = bool(on)
+    if ENABLED:
+        _setup_log()
+
+
+if ENABLED:
+    _setup_log()
+
+
+def _record(name, sec):
+    with _lock:
+        q = _samples.get(name)
+        if q is None:
+            q = _samples[name] = deque(maxlen=HISTORY)
+        q.append(sec * 1000)
+
+
+def start_rerun(t0=None):
+    _local.t0 = t0 if t0 is not None else time.perf_counter()
+    _local.sections = []
+
+
+@contextmanager
+def section(name):
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        sec = time.perf_counter() - t0
+        getattr(_local, "sections", []).append((name, sec))
+        _record(name, sec)
+
+
+def timed(name):
+    # 函式版的 section：@profiling.timed("房貸 拆分")
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with section(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def end_rerun(page):
+    global _first
+    if not ENABLED or not hasattr(_local, "t0"):
+        _first = False  # 執行中才打開的不算 cold start
+        return
+    total = time.perf_counter() - _local.t0
+    _record("rerun", total)
+    parts = " | ".join(f"{name} {sec * 1000:.1f}" for name, sec in _local.sections)
+    if _first:
+        _first = False
+        log.info(f"cold start {(time.perf_counter() - _PROCESS_T0) * 1000:.0f} ms since first import")
+    log.info(f"rerun page={page} total={total * 1000:.1f} ms | {parts}")
+
+
+# --- 統計 / 匯出 ---
+def _pct(values, q):
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def samples():
+    with _lock:
+        return {name: list(q) for name, q in _samples.items()}
+
+
+def summary():
+    # 每個區段：次數、平均、p50 / p95、最大 (ms)，依總耗時排序
+    rows = []
+    for name, values in samples().items():
+        v = sorted(values)
+        rows.append({"區段": name, "次數": len(v), "平均": sum(v) / len(v), "p50": _pct(v, 0.5),
+                     "p95": _pct(v, 0.95), "最大": v[-1], "合計": sum(v)})
+    return sorted(rows, key=lambda r: -r["合計"])
+
+
+def export():
+    return json.dumps({
+        "exported_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "enabled": ENABLED,
+        "history": HISTORY,
+        "summary": summary(),
+        "samples_ms": samples(),
+    }, ensure_ascii=False, indent=1)
+
+
+def reset():
+    with _lock:
+        _samples.clear()
@@ -0,0 +1,177 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import mortgage
+import storage
+from dateindex import day_ordinal
+
+# --- 固定收支排程 ---
+# 固定項目加上排程：freq (月 / 年 / 週)、day (每月幾號；週為 0=週一)、start、end (可無)、account。
+# 啟動時把上次執行 (各項目的水位) 之後漏掉的期數一次向量化產生，
+# 以「項目 + 期別」當 key 冪等入帳 (同一期不會記兩次)；
+# 房貸設定自動扣款帳戶時，每月依攤還表記一筆月付
+
+FREQS = {"月": 1, "年": 12, "週": 0}
+WEEKDAYS = "一二三四五六日"
+COLS = storage.LEDGER_COLS + ["key", "loan", "principal"]
+
+
+def _month(days):
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _expand(n):
+    # 每個項目 n[i] 期 → (項目位置, 第幾期)
+    rep = np.repeat(np.arange(len(n)), n)
+    return rep, np.arange(len(rep)) - np.repeat(np.cumsum(n) - n, n)
+
+
+def _by_month(lo, hi, step, anchor, day):
+    # 每 step 個月一期 (對齊 anchor 月)，當月第 day 天 (超過月底取月底)
+    m_lo, m_hi = _month(lo), _month(hi)
+    first = m_lo + (anchor - m_lo) % step
+    n = np.maximum((m_hi - first) // step + 1, 0)
+    rep, k = _expand(n)
+    month = (first[rep] + k * step[rep]).astype("datetime64[M]")
+    d0 = month.astype("datetime64[D]")
+    mlen = ((month + 1).astype("datetime64[D]") - d0).astype(np.int64)
+    date = d0.astype(np.int64) + np.minimum(day[rep], mlen) - 1
+    ok = (date >= lo[rep]) & (date <= hi[rep])
+    return rep[ok], date[ok], month[ok]
+
+
+def _by_week(lo, hi, weekday):
+    # weekday：0 = 週一；lo 是該週第幾天 = lo - 該週週一
+    first = lo + (weekday - (lo - analytics.period_start(lo, "week"))) % 7
+    n = np.maximum((hi - first) // 7 + 1, 0)
+    rep, k = _expand(n)
+    date = first[rep] + 7 * k
+    return rep, date
+
+
+def period_label(freq, d):
+    # 期別：月 "2026-10"、年 "2026"、週 "W" + 該週週一
+    if freq == "年":
+        return str(d.year)
+    if freq == "週":
+        return "W" + (d - datetime.timedelta(days=d.weekday())).isoformat()
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def item_key(item, d):
+    return f"rec:{item['name']}:{period_label(item.get('freq', '月'), d)}"
+
+
+def describe(item):
+    freq = item.get("freq", "月")
+    day = int(item.get("day", 1))
+    when = {"月": f"每月 {day} 日", "年": f"每年 {item['start'].month} 月 {day} 日" if item.get("start") else "",
+            "週": f"每週{WEEKDAYS[day % 7]}"}[freq]
+    span = f"自 {item['start']}" + (f" 至 {item['end']}" if item.get("end") else "") if item.get("start") else "未排程"
+    return f"{when} • {item.get('account') or '—'} • {span}"
+
+
+def _lower(mark, start):
+    return max(start, day_ordinal(mark) + 1) if mark else start
+
+
+def _labels(month, unit):
+    # 期別字串：只對出現的月份範圍轉一次字串再依位置取
+    if not len(month):
+        return np.zeros(0, dtype=str)
+    base = month.min()
+    pos = (month - base).astype(np.int64)
+    return np.datetime_as_string(base + np.arange(pos.max() + 1), unit=unit)[pos]
+
+
+def _pick(values, idx):
+    return pd.Series(values).take(idx).reset_index(drop=True)
+
+
+def _recurring(items, marks, hi):
+    start = np.array([day_ordinal(it["start"]) for it in items], dtype=np.int64)
+    lo = np.array([_lower(marks.get(f"rec:{it['name']}"), s) for it, s in zip(items, start)], dtype=np.int64)
+    end = np.array([min(day_ordinal(it["end"]), hi) if it.get("end") else hi for it in items], dtype=np.int64)
+    step = np.array([FREQS[it.get("freq", "月")] for it in items], dtype=np.int64)
+    day = np.array([int(it.get("day", 1)) for it in items], dtype=np.int64)
+
+    parts = []
+    m = np.flatnonzero(step > 0)
+    if len(m):
+        rep, date, month = _by_month(lo[m], end[m], step[m], _month(start[m]), day[m])
+        label = np.where(step[m][rep] == 12, _labels(month.astype("datetime64[Y]"), "Y"), _labels(month, "M"))
+        parts.append((m[rep], date, label))
+    w = np.flatnonzero(step == 0)
+    if len(w):
+        rep, date = _by_week(lo[w], end[w], day[w] % 7)
+        monday = analytics.period_start(date, "week").astype("datetime64[D]")
+        parts.append((w[rep], date, np.char.add("W", _labels(monday, "D"))))
+    idx = np.concatenate([p[0] for p in parts])
+    date = np.concatenate([p[1] for p in parts])
+    label = np.concatenate([p[2] for p in parts])
+
+    prefix = np.array([f"rec:{it['name']}:" for it in items])
+    return pd.DataFrame({
+        "日期": date.astype("datetime64[D]"),
+        "帳戶": _pick([it.get("account", "") for it in items], idx),
+        "類型": _pick([it["type"] for it in items], idx),
+        "分類": _pick([it["cat"] for it in items], idx),
+        "金額": np.array([float(it["amt"]) for it in items])[idx],
+        "幣別": _pick([it["curr"] for it in items], idx),
+        "備註": _pick([f"固定: {it['name']}" for it in items], idx),
+        "key": np.char.add(prefix[idx], label),
+        "loan": None,
+        "principal": 0.0,
+    })
+
+
+def _autopay(name, loan, marks, hi):
+    sched = mortgage.schedule(loan)
+    start = day_ordinal(loan["start_date"])
+    lo = _lower(marks.get(f"loan:{name}"), start)
+    day = int(loan.get("autopay_day", loan["start_date"].day))
+    _, date, month = _by_month(np.array([lo]), np.array([hi]), np.array([1]), _month(np.array([start])), np.array([day]))
+    m = month.astype(np.int64) - _month(start)
+    n = len(sched["payment"])
+    mi = np.minimum(m, n - 1)
+    # 已結清 (月付為 0) 或超過年限的月份不入帳
+    pay = np.where(m < n, sched["payment"][mi], 0.0)
+    prin = sched["principal"][mi]
+    ok = pay > 0
+    return pd.DataFrame({
+        "日期": date[ok].astype("datetime64[D]"),
+        "帳戶": loan["autopay"],
+        "類型": "支出",
+        "分類": "房貸",
+        "金額": pay[ok].round(0),
+        "幣別": loan.get("currency", "TWD"),
+        "備註": f"自動扣款: {name}",
+        "key": np.char.add(f"loan:{name}:", _labels(month[ok], "M")),
+        "loan": name,
+        "principal": prin[ok],
+    })
+
+
+def targets(recurring, loans):
+    # 參與排程的項目 (水位 key)：有 start 的固定項目、設定自動扣款的房貸
+    return ([f"rec:{it['name']}" for it in recurring if it.get("start")] +
+            [f"loan:{name}" for name, loan in loans.items() if loan.get("autopay")])
+
+
+def catch_up(recurring, loans, marks, today):
+    # marks：{項目: 上次排程日}；回傳 (marks, today] 內所有該入帳的期數 (COLS 欄位，依日期排序)
+    hi = day_ordinal(today)
+    parts = []
+    items = [it for it in recurring if it.get("start")]
+    if items:
+        parts.append(_recurring(items, marks, hi))
+    for name, loan in loans.items():
+        if loan.get("autopay"):
+            parts.append(_autopay(name, loan, marks, hi))
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=COLS)
+    return pd.concat(parts, ignore_index=True).sort_values("日期", kind="stable", ignore_index=True)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# --- 帳本欄位型別 ---
+# 記憶體帳本只有一種表示法，載入、記帳、固定收支、匯入、修改都經過這裡：
+#   帳戶 / 類型 / 分類 / 幣別 → category (每列 1~2 byte code，比較 = 整數比較)
+#   日期 → datetime64[s] (pandas 沒有 [D]；一樣 8 bytes，比較、排序都是整數運算)
+#   金額 → float64 (原幣，VND 等無小數幣別也夠精確)；備註 → 字串
+# 合併新列時 category 先取聯集，避免 concat 退回 object
+
+CATEGORIES = ["帳戶", "類型", "分類", "幣別"]
+DATE = "datetime64[s]"
+
+
+def typed(df):
+    # 就地轉成帳本型別 (已經是的欄位不動)，回傳同一個 DataFrame
+    if df["日期"].dtype != DATE:
+        df["日期"] = pd.to_datetime(pd.Series(df["日期"].to_numpy(), index=df.index)).astype(DATE)
+    for c in CATEGORIES:
+        if not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    if df["金額"].dtype != np.float64:
+        df["金額"] = df["金額"].astype(np.float64)
+    df["備註"] = df["備註"].fillna("").astype(str)
+    return df
+
+
+def _align(frames):
+    # 各 category 欄統一成同一組 categories (依第一次出現的順序)
+    for c in CATEGORIES:
+        cats = list(frames[0][c].cat.categories)
+        seen = set(cats)
+        for f in frames[1:]:
+            cats += [v for v in f[c].cat.categories if v not in seen]
+            seen.update(cats)
+        for f in frames:
+            if len(f[c].cat.categories) != len(cats):
+                f[c] = f[c].cat.set_categories(cats)
+            elif list(f[c].cat.categories) != cats:
+                f[c] = f[c].cat.reorder_categories(cats)
+
+
+def concat(frames):
+    frames = [typed(f) for f in frames]
+    _align(frames)
+    return pd.concat(frames)
+
+
+def set_rows(df, new):
+    # 以 new 的 index / 欄位覆寫 df 的既有列；category 欄遇到新值先加進 categories
+    new = typed(new.copy())
+    for c in new.columns:
+        if c in CATEGORIES:
+            missing = [v for v in new[c].cat.categories if v not in df[c].cat.categories]
+            if missing:
+                df[c] = df[c].cat.add_categories(missing)
+            df.loc[new.index, c] = new[c].astype(object).to_numpy()
+        else:
+            df.loc[new.index, c] = new[c].to_numpy()
+
+
+def legacy(df):
+    # 對照用的舊表示法：字串欄為 object、日期為 datetime.date 物件
+    out = df.copy()
+    out["日期"] = pd.Series(pd.to_datetime(df["日期"]).dt.date.to_numpy(dtype=object), index=df.index, dtype=object)
+    for c in CATEGORIES + ["備註"]:
+        out[c] = pd.Series(df[c].astype(str).to_numpy(dtype=object), index=df.index, dtype=object)
+    return out
+
+
+def memory(df):
+    # 各欄實際佔用 (deep，含字串 / 物件本身) 與每列 bytes
+    usage = df.memory_usage(deep=True)
+    out = pd.DataFrame({"型別": [str(df.index.dtype)] + [str(t) for t in df.dtypes], "bytes": usage.to_numpy()},
+                       index=usage.index)
+    out.loc["合計"] = ["", int(usage.sum())]
+    out["bytes/列"] = out["bytes"] / max(len(df), 1)
+    return out
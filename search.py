@@ -0,0 +1,276 @@
+import bisect
+import functools
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from dateindex import day_ordinal, to_days
+
+# --- 交易搜尋索引 ---
+# 每筆交易一個位置 (pos，依加入順序)，id / 日數 / 金額 / 備註代碼 都以 pos 對齊存放。
+# 備註先去重 (同樣的備註只切一次詞)，倒排索引是 token → 備註代碼：
+#   中日韓文字切單字 + 相鄰兩字 (河粉 → 河、粉、河粉)，其他文字切詞 (小寫、去重音)，英數詞可前綴比對。
+#   三字以上的中文連續段另外整段收錄 (RUN 開頭)：查「牛肉麵」= 掃一遍不重複的連續段、聯集包含它的，不必逐筆驗證。
+#   整批建立時存成 CSR；之後新出現的備註先放 delta (token → list)，delta 太大才整理回 CSR。
+#   新備註的代碼都比 CSR 裡的大，兩段接起來仍是排序好的
+# 帳戶 / 分類 / 類型 / 幣別：每個值一張 bitmap (packbits, little bit order)；刪除只清 alive 位元
+
+FACETS = ["帳戶", "分類", "類型", "幣別"]
+COMPACT = 50_000  # delta 累積超過這麼多 (token, 備註) 就整理回 CSR
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_SPLIT = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+_IS_CJK = re.compile(f"[{_CJK}]")
+RUN = "\x00"
+_POP = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def _fold(word):
+    # 小寫、去掉重音 (phở → pho)
+    return "".join(c for c in unicodedata.normalize("NFKD", word.casefold()) if not unicodedata.combining(c))
+
+
+@functools.lru_cache(maxsize=65536)
+def _run_tokens(cjk, word):
+    if cjk:
+        out = set(cjk) | {cjk[i:i + 2] for i in range(len(cjk) - 1)}
+        if len(cjk) > 2:
+            out.add(RUN + cjk)
+        return frozenset(out)
+    return frozenset((_fold(word),))
+
+
+def tokens(text):
+    out = set()
+    for run in _SPLIT.findall(text or ""):
+        out |= _run_tokens(*run)
+    return out
+
+
+def _csr(notes):
+    # token → 排序好的備註代碼。token id 以連續段為單位快取，同一備註重複的 token 排序後去掉
+    vocab, run_ids, tok = {}, {}, []
+    count = np.zeros(len(notes), dtype=np.int64)
+    for u, text in enumerate(notes):
+        n = 0
+        for run in _SPLIT.findall(text):
+            ids = run_ids.get(run)
+            if ids is None:
+                ids = run_ids[run] = [vocab.setdefault(t, len(vocab)) for t in _run_tokens(*run)]
+            tok.extend(ids)
+            n += len(ids)
+        count[u] = n
+    tok = np.array(tok, dtype=np.int32)
+    order = np.argsort(tok, kind="stable")
+    tok = tok[order]
+    note = np.repeat(np.arange(len(notes), dtype=np.int64), count)[order]
+    keep = np.r_[True, (tok[1:] != tok[:-1]) | (note[1:] != note[:-1])] if len(tok) else np.zeros(0, dtype=bool)
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tok[keep], minlength=len(vocab)), out=offsets[1:])
+    return vocab, offsets, note[keep]
+
+
+def _pack(mask):
+    return np.packbits(mask, bitorder="little")
+
+
+class SearchIndex:
+    def __init__(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.days = np.zeros(0, dtype=np.int64)
+        self.amount = np.zeros(0, dtype=np.float64)
+        self.note_of = np.zeros(0, dtype=np.int64)
+        self.notes, self.note_code = [], {}
+        self.alive = np.zeros(0, dtype=np.uint8)
+        self.bitmaps = {f: {} for f in FACETS}
+        self.vocab, self.offsets, self.postings = {}, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        self.delta = {}
+        self.delta_size = 0
+        self._words = None
+        self._runs = None
+
+    @classmethod
+    def from_frame(cls, df):
+        idx = cls()
+        idx._append(df)
+        return idx
+
+    def __len__(self):
+        return int(_POP[self.alive].sum())
+
+    # --- 寫入 ---
+    def _grow(self, n):
+        # bitmap 長度跟上 n 個位置
+        need = (n + 7) // 8
+        if len(self.alive) >= need:
+            return
+        cap = max(need, len(self.alive) * 2)
+        pad = lambda bm: np.concatenate([bm, np.zeros(cap - len(bm), dtype=np.uint8)])
+        self.alive = pad(self.alive)
+        for values in self.bitmaps.values():
+            for v in values:
+                values[v] = pad(values[v])
+
+    def _append(self, df):
+        if df.empty:
+            return
+        n0, k = len(self.ids), len(df)
+        self.ids = np.concatenate([self.ids, df.index.to_numpy(dtype=np.int64)])
+        self.days = np.concatenate([self.days, to_days(df["日期"])])
+        self.amount = np.concatenate([self.amount, df["金額"].to_numpy(dtype=np.float64)])
+        self._grow(n0 + k)
+        pos = np.arange(n0, n0 + k)
+        self._set(self.alive, pos)
+        for f in FACETS:
+            codes, uniq = pd.factorize(df[f].astype(str))
+            for c, v in enumerate(uniq):
+                bm = self.bitmaps[f].setdefault(v, np.zeros(len(self.alive), dtype=np.uint8))
+                self._set(bm, pos[codes == c])
+
+        # 備註代碼：沒看過的備註才切詞
+        codes, uniq = pd.factorize(df["備註"].fillna("").astype(str))
+        uniq = uniq.tolist()
+        if n0 == 0:
+            self.notes = uniq
+            self.note_code = dict(zip(uniq, range(len(uniq))))
+            self.note_of = codes.astype(np.int64)
+            self.compact()
+            return
+        local = np.empty(len(uniq), dtype=np.int64)
+        fresh = []
+        for c, text in enumerate(uniq):
+            code = self.note_code.get(text)
+            if code is None:
+                code = self.note_code[text] = len(self.notes)
+                self.notes.append(text)
+                fresh.append(code)
+            local[c] = code
+        self.note_of = np.concatenate([self.note_of, local[codes]])
+        for code in fresh:
+            for t in tokens(self.notes[code]):
+                if t not in self.vocab and t not in self.delta:
+                    self._words = self._runs = None
+                self.delta.setdefault(t, []).append(code)
+                self.delta_size += 1
+        if self.delta_size > COMPACT:
+            self.compact()
+
+    @staticmethod
+    def _set(bm, pos, on=True):
+        if len(pos) * 8 > len(bm):
+            # 大批：解開成 bool 改完再壓回去
+            mask = np.unpackbits(bm, bitorder="little")
+            mask[pos] = on
+            bm[:] = _pack(mask)
+            return
+        bits = (np.uint8(1) << (pos & 7).astype(np.uint8))
+        if on:
+            np.bitwise_or.at(bm, pos >> 3, bits)
+        else:
+            np.bitwise_and.at(bm, pos >> 3, ~bits)
+
+    def add(self, df):
+        self._append(df)
+
+    def remove(self, df):
+        # 只清 alive 位元；位置與 posting 留著，查詢時過濾掉
+        pos = np.flatnonzero(np.isin(self.ids, df.index.to_numpy(dtype=np.int64)))
+        self._set(self.alive, pos, on=False)
+
+    def compact(self):
+        self.vocab, self.offsets, self.postings = _csr(self.notes)
+        self.delta, self.delta_size, self._words, self._runs = {}, 0, None, None
+
+    # --- 查詢 ---
+    def _posting(self, t):
+        tid = self.vocab.get(t)
+        base = self.postings[self.offsets[tid]:self.offsets[tid + 1]] if tid is not None else self.postings[:0]
+        extra = self.delta.get(t)
+        return np.concatenate([base, np.array(extra, dtype=np.int64)]) if extra else base
+
+    def _union(self, terms):
+        parts = [self._posting(t) for t in terms]
+        if len(parts) == 1:
+            return parts[0]
+        return np.unique(np.concatenate(parts)) if parts else self.postings[:0]
+
+    def _prefix(self, word):
+        # 英數詞做前綴比對：排序好的詞彙表二分找範圍，合併所有符合詞的 posting
+        if self._words is None:
+            self._words = sorted(t for t in set(self.vocab) | set(self.delta) if not _IS_CJK.match(t) and t[0] != RUN)
+        lo = bisect.bisect_left(self._words, word)
+        hi = bisect.bisect_left(self._words, word + "\U0010ffff")
+        return self._union(self._words[lo:hi])
+
+    def _phrase(self, cjk):
+        # 包含這串字的所有中文連續段
+        if self._runs is None:
+            self._runs = [t for t in set(self.vocab) | set(self.delta) if t[0] == RUN]
+        return self._union([t for t in self._runs if cjk in t])
+
+    def _text(self, text):
+        # 符合的備註代碼：每個詞都要出現 (AND)
+        lists = []
+        for cjk, word in _SPLIT.findall(text):
+            if cjk:
+                lists.append(self._posting(cjk) if len(cjk) <= 2 else self._phrase(cjk))
+            else:
+                lists.append(self._prefix(_fold(word)))
+        if not lists:
+            return None
+        lists.sort(key=len)
+        codes = lists[0]
+        for other in lists[1:]:
+            if not len(codes):
+                break
+            codes = np.intersect1d(codes, other, assume_unique=True)
+        return codes
+
+    def _facet_mask(self, facets):
+        # 同一欄多個值 OR，不同欄 AND，最後 AND alive
+        mask = self.alive.copy()
+        for f, values in (facets or {}).items():
+            if not values:
+                continue
+            sel = np.zeros_like(mask)
+            for v in values:
+                bm = self.bitmaps[f].get(v)
+                if bm is not None:
+                    sel |= bm
+            mask &= sel
+        return mask
+
+    def query(self, text="", facets=None, amount=(None, None), dates=(None, None)):
+        # 回傳符合條件的位置 (遞增)
+        n = len(self.ids)
+        mask = np.unpackbits(self._facet_mask(facets), bitorder="little", count=n).view(bool)
+        codes = self._text(text) if text and text.strip() else None
+        if codes is not None:
+            hit = np.zeros(len(self.notes), dtype=bool)
+            hit[codes] = True
+            mask &= hit[self.note_of]
+        pos = np.flatnonzero(mask)
+        lo, hi = amount
+        if lo is not None:
+            pos = pos[self.amount[pos] >= lo]
+        if hi is not None:
+            pos = pos[self.amount[pos] <= hi]
+        lo, hi = dates
+        if lo is not None:
+            pos = pos[self.days[pos] >= day_ordinal(lo)]
+        if hi is not None:
+            pos = pos[self.days[pos] <= day_ordinal(hi)]
+        return pos
+
+    def result_ids(self, pos):
+        # 帳本 id，日期新到舊 (同一天後加入的在前)
+        order = np.lexsort((-pos, -self.days[pos]))
+        return self.ids[pos[order]]
+
+    def facet_counts(self, pos):
+        # 結果集在每個 facet 值的筆數：結果 bitmap AND 各值 bitmap 後 popcount
+        res = np.zeros_like(self.alive)
+        self._set(res, pos)
+        return {f: {v: int(_POP[bm & res].sum()) for v, bm in values.items()} for f, values in self.bitmaps.items()}
@@ -0,0 +1,332 @@
+import datetime
+import os
+
+import pandas as pd
+import streamlit as st
+
+import analytics
+import balances
+import dateindex
+import forecast
+import fx
+import networth
+import portfolio
+import profiling
+import scheduler
+import schema
+import search
+import storage
+
+
+# --- Session 狀態與資料層 ---
+# 各頁共用的資料載入、寫入與衍生結構；頁面模組只透過這裡讀寫帳本
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+
+# 整個 process 共用一個 Store (SQLite 連線池)；各 session 只拿自己使用者的分區
+@st.cache_resource
+def get_pool():
+    return storage.Store()
+
+
+def current_user():
+    if 'user' not in st.session_state:
+        st.session_state['user'] = st.query_params.get("user", storage.DEFAULT_USER)
+    return st.session_state['user']
+
+
+def get_store():
+    return get_pool().for_user(current_user())
+
+
+# 屬於目前使用者的 session 資料；切換使用者時整批清掉，下次 rerun 由 init_session 重新載入
+USER_KEYS = ['rates', 'categories', 'recurring', 'accounts', 'loans', 'stocks', 'data',
+             'twd_rates', 'twd_hist_key', 'date_index', 'date_index_rates', 'balances',
+             'cube', 'cube_rates', 'cube_hist', 'cube_hist_rates', 'stocks_version',
+             'portfolio', 'portfolio_key', 'portfolio_hist', 'portfolio_hist_key', 'snapshots',
+             'networth', 'networth_key', 'networth_hist', 'networth_hist_key', 'forecast', 'search', '_init']
+
+
+def switch_user(user):
+    for key in USER_KEYS:
+        st.session_state.pop(key, None)
+    st.session_state['user'] = user
+    st.query_params["user"] = user
+
+
+# CSS 只讀檔一次；Streamlit 每次 rerun 仍須重新送出 (沒送出的元素會被移除)
+@st.cache_resource
+def css():
+    with open(os.path.join(STATIC_DIR, "style.css"), encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+# 新使用者：寫入預設資料 (只做一次)；示範帳戶 / 房貸 / 交易只給 default 使用者
+def seed_defaults(store):
+    store.put_items('rates', {"TWD": 1.0, "USD": 32.5, "JPY": 0.21, "VND": 0.00128, "EUR": 35.2})
+    store.put_items('categories', {
+        "支出": ["房貸", "餐飲", "交通", "購物", "居住", "娛樂", "醫療", "訂閱"],
+        "收入": ["薪資", "獎金", "股息", "副業"]
+    })
+    if store.user != storage.DEFAULT_USER:
+        store.put_item('meta', 'seeded', True)
+        return
+    month1 = datetime.date.today().replace(day=1)
+    store.put_items('recurring', {
+        "Netflix": {"name": "Netflix", "amt": 390, "type": "支出", "cat": "訂閱", "curr": "TWD",
+                    "freq": "月", "day": 15, "start": month1, "end": None, "account": "台幣薪轉"},
+        "房租": {"name": "房租", "amt": 25000, "type": "支出", "cat": "居住", "curr": "TWD",
+                 "freq": "月", "day": 5, "start": month1, "end": None, "account": "台幣薪轉"}
+    })
+    store.put_items('accounts', {
+        "台幣薪轉": {"type": "銀行", "currency": "TWD", "balance": 150000, "icon": "🏦"},
+        "越南薪資": {"type": "銀行", "currency": "VND", "balance": 50000000, "icon": "🇻🇳"},
+        "隨身皮夾": {"type": "現金", "currency": "VND", "balance": 2500000, "icon": "💵"},
+    })
+    store.put_items('loans', {
+        "自住屋房貸": {
+            "total": 10350000, "rate": 2.53, "years": 30, "grace_period": 2,
+            "start_date": datetime.date(2025, 11, 1), "remaining": 10350000, "paid_principal": 0
+        }
+    })
+    store.append({"日期": datetime.date.today(), "帳戶": "隨身皮夾", "類型": "支出", "分類": "餐飲", "金額": 50000, "幣別": "VND", "備註": "河粉"})
+    store.put_item('meta', 'seeded', True)
+
+
+# Session 預設值：每個 session 只跑一次，不在每次 rerun 重建
+def init_session():
+    if st.session_state.get('_init'):
+        return
+    if 'current_page' not in st.session_state: st.session_state.current_page = "帳本"
+    # 初始化週曆檢視日期
+    if 'view_date' not in st.session_state: st.session_state.view_date = datetime.date.today()
+    # 初始化選中日期
+    if 'selected_date' not in st.session_state: st.session_state.selected_date = datetime.date.today()
+
+    store = get_store()
+    if not store.has_items('meta'):
+        seed_defaults(store)
+
+    if 'rates' not in st.session_state:
+        st.session_state['rates'] = store.load_items('rates')
+
+    if 'categories' not in st.session_state:
+        st.session_state['categories'] = store.load_items('categories')
+
+    if 'recurring' not in st.session_state:
+        st.session_state['recurring'] = list(store.load_items('recurring').values())
+
+    if 'accounts' not in st.session_state:
+        st.session_state['accounts'] = store.load_items('accounts')
+
+    if 'loans' not in st.session_state or isinstance(st.session_state['loans'], list):
+        st.session_state['loans'] = store.load_items('loans')
+
+    if 'stocks' not in st.session_state or isinstance(st.session_state['stocks'], pd.DataFrame):
+        st.session_state['stocks'] = store.load_items('stocks')
+
+    if 'data' not in st.session_state:
+        st.session_state['data'] = store.load_ledger()
+    run_scheduler()
+    st.session_state['_init'] = True
+
+
+# 隨帳本增量維護的衍生結構 (都有 add / remove)
+DERIVED = ['date_index', 'balances', 'cube', 'cube_hist', 'snapshots', 'search']
+
+
+# 新增交易：寫入資料庫，記憶體端以資料庫 id 當 index
+def add_records(recs):
+    add_frame(pd.DataFrame(recs, columns=storage.LEDGER_COLS))
+
+
+def add_frame(new):
+    new = new[storage.LEDGER_COLS].copy()
+    _ingest(new, get_store().append_frame(new))
+
+
+# 已寫入資料庫的新列併進記憶體端帳本與衍生結構
+def _ingest(new, ids):
+    new.index = ids
+    schema.typed(new)
+    new[fx.TWD_COL] = fx.to_twd(new['金額'], new['幣別'], st.session_state['rates'])
+    if 'twd_hist_key' in st.session_state:
+        new[fx.TWD_HIST_COL] = get_rate_table().to_twd(new['金額'], new['幣別'], new['日期'], st.session_state['rates'])
+    st.session_state['data'] = schema.concat([new, st.session_state['data']])
+    for name in DERIVED:
+        if name in st.session_state:
+            st.session_state[name].add(new)
+
+
+# 排程入帳：以 key 冪等寫入 (別的 session 已記過的期數略過)，回傳實際新增的列
+def post_scheduled(batch):
+    ids, keep = get_store().append_once(batch[storage.LEDGER_COLS], batch['key'].tolist())
+    posted = batch[keep]
+    if len(posted):
+        _ingest(posted[storage.LEDGER_COLS].copy(), ids)
+    return posted
+
+
+# 啟動時補記上次執行後漏掉的固定收支與房貸自動扣款，一批寫入
+def run_scheduler(today=None):
+    today = today or datetime.date.today()
+    store = get_store()
+    marks = store.load_items('schedule')
+    batch = scheduler.catch_up(st.session_state['recurring'], st.session_state['loans'], marks, today)
+    posted = post_scheduled(batch) if len(batch) else batch
+    # 自動扣款的本金：和手動記房貸一樣從剩餘本金扣掉
+    for name, prin in posted.groupby('loan')['principal'].sum().items():
+        loan = st.session_state['loans'][name]
+        loan['remaining'] -= prin
+        store.put_item('loans', name, loan)
+    store.put_items('schedule', {k: today for k in scheduler.targets(st.session_state['recurring'], st.session_state['loans'])})
+    return posted
+
+
+def update_record(rid, rec):
+    df = st.session_state['data']
+    old = df.loc[[rid]]
+    get_store().update(rid, rec)
+    new = schema.typed(pd.DataFrame([rec], index=[rid], columns=storage.LEDGER_COLS))
+    new[fx.TWD_COL] = fx.to_twd(new['金額'], new['幣別'], st.session_state['rates'])
+    if 'twd_hist_key' in st.session_state:
+        new[fx.TWD_HIST_COL] = get_rate_table().to_twd(new['金額'], new['幣別'], new['日期'], st.session_state['rates'])
+    schema.set_rows(df, new)
+    for name in DERIVED:
+        if name in st.session_state:
+            st.session_state[name].remove(old)
+            st.session_state[name].add(new)
+
+
+def delete_record(rid):
+    old = st.session_state['data'].loc[[rid]]
+    get_store().delete(rid)
+    st.session_state['data'] = st.session_state['data'].drop(index=rid)
+    for name in DERIVED:
+        if name in st.session_state:
+            st.session_state[name].remove(old)
+
+
+# 歷史匯率表 (rates/*.csv)，全部 session 共用一份
+@st.cache_resource
+def get_rate_table():
+    return fx.RateTable.from_dir()
+
+
+# 帳本的 金額(TWD) 快取欄：匯率變動才整欄重算，平時只補新進的列
+def ensure_twd():
+    key = fx.rates_key(st.session_state['rates'])
+    full = st.session_state.get('twd_rates') != key
+    with profiling.section("匯率換算"):
+        st.session_state['data'] = fx.fill_twd(st.session_state['data'], st.session_state['rates'], full)
+    st.session_state['twd_rates'] = key
+    return st.session_state['data']
+
+
+# 交易當日匯率的 金額(TWD歷史) 欄：匯率表或目前匯率 (無歷史幣別的備援) 變動才整欄重算
+def ensure_twd_hist():
+    key = (get_rate_table().token, fx.rates_key(st.session_state['rates']))
+    full = st.session_state.get('twd_hist_key') != key
+    with profiling.section("匯率換算 (歷史)"):
+        st.session_state['data'] = fx.fill_twd_hist(st.session_state['data'], get_rate_table(), st.session_state['rates'], full)
+    st.session_state['twd_hist_key'] = key
+    return st.session_state['data']
+
+
+# 日期索引：匯率變動 (每日小計失效) 時才整本重建，新增交易走 DateIndex.add
+def get_date_index():
+    df = ensure_twd()
+    if st.session_state.get('date_index_rates') != st.session_state['twd_rates']:
+        st.session_state['date_index'] = dateindex.DateIndex.from_frame(df, fx.TWD_COL)
+        st.session_state['date_index_rates'] = st.session_state['twd_rates']
+    return st.session_state['date_index']
+
+
+# 分析 cube：同日期索引，匯率變動才整本重建；hist=True 用交易當日匯率
+def get_cube(hist=False):
+    if hist:
+        df, key, name, col = ensure_twd_hist(), st.session_state['twd_hist_key'], 'cube_hist', fx.TWD_HIST_COL
+    else:
+        df, key, name, col = ensure_twd(), st.session_state['twd_rates'], 'cube', fx.TWD_COL
+    if st.session_state.get(f'{name}_rates') != key:
+        st.session_state[name] = analytics.Cube.from_frame(df, col)
+        st.session_state[f'{name}_rates'] = key
+    return st.session_state[name]
+
+
+# 餘額快照：資料庫已維護好，session 只載入一次，之後隨交易增量更新
+def get_snapshots():
+    if 'snapshots' not in st.session_state:
+        st.session_state['snapshots'] = networth.Snapshots.from_store(get_store().load_snapshots())
+    return st.session_state['snapshots']
+
+
+# 每日淨資產：快照、帳戶期初、房貸、持倉或匯率變動才重算 (只是幾條向量運算)
+def get_networth(hist=False):
+    snap = get_snapshots()
+    pf = get_portfolio(hist)
+    rates = st.session_state['rates']
+    key = (snap.token, snap.version, pf.token, fx.rates_key(rates), datetime.date.today(),
+           storage.dumps(st.session_state['accounts']), storage.dumps(st.session_state['loans']))
+    name = 'networth_hist' if hist else 'networth'
+    if st.session_state.get(f'{name}_key') != key:
+        st.session_state[name] = networth.daily(snap, st.session_state['accounts'], st.session_state['loans'], rates,
+                                                datetime.date.today(), get_rate_table() if hist else None, pf)
+        st.session_state[f'{name}_key'] = key
+    return st.session_state[name]
+
+
+# 搜尋索引：第一次開搜尋頁時整本建立，之後隨交易增量更新
+def get_search():
+    if 'search' not in st.session_state:
+        st.session_state['search'] = search.SearchIndex.from_frame(st.session_state['data'])
+    return st.session_state['search']
+
+
+# 帳戶餘額：(帳戶, 類型) 累計表，交易異動時增量更新
+def get_balances():
+    if 'balances' not in st.session_state:
+        st.session_state['balances'] = balances.BalanceBook.from_frame(st.session_state['data'])
+    return st.session_state['balances']
+
+
+# 股票：買進 / 賣出一筆 (qty 賣出為負)，持倉版本 +1 讓估值重算
+def add_lot(ticker, name, currency, lot):
+    holding = st.session_state['stocks'].setdefault(ticker, {"name": name, "currency": currency, "lots": []})
+    holding['lots'].append(lot)
+    get_store().put_item('stocks', ticker, holding)
+    st.session_state['stocks_version'] = st.session_state.get('stocks_version', 0) + 1
+
+
+# 價格檔依 (代號, 修改時間) 快取，全部 session 共用；換檔自動失效
+@st.cache_resource(max_entries=8)
+def get_price_table(sig):
+    return portfolio.PriceTable.from_dir([t for t, _ in sig])
+
+
+# 持倉估值：持倉、價格檔、匯率或日期變動才整批重算；hist=True 用逐日歷史匯率
+def get_portfolio(hist=False):
+    holdings = st.session_state['stocks']
+    table = get_price_table(portfolio.signature(holdings))
+    rates = st.session_state['rates']
+    key = (st.session_state.get('stocks_version', 0), table.token, fx.rates_key(rates), datetime.date.today(),
+           get_rate_table().token if hist else None)
+    name = 'portfolio_hist' if hist else 'portfolio'
+    if st.session_state.get(f'{name}_key') != key:
+        st.session_state[name] = portfolio.Portfolio(holdings, table, rates, get_rate_table() if hist else None)
+        st.session_state[f'{name}_key'] = key
+    return st.session_state[name]
+
+
+# 蒙地卡羅預測：目前帳戶餘額 (TWD)、股票市值、歷史變動收支、固定收支與房貸為起點；結果留在 session 直到重跑
+def run_forecast(paths, years, lookback=36, **assume):
+    rates = st.session_state['rates']
+    book = get_balances()
+    cash = sum(book.balance(name, info['balance']) * rates.get(info['currency'], 1.0)
+               for name, info in st.session_state['accounts'].items())
+    today = datetime.date.today()
+    inputs = forecast.build_inputs(ensure_twd(), cash, get_portfolio().value_on(today), st.session_state['recurring'],
+                                   st.session_state['loans'], rates, today, int(years * 12), lookback)
+    st.session_state['forecast'] = forecast.run(inputs, paths, **assume)
+    return st.session_state['forecast']
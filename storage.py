@@ -0,0 +1,344 @@
+import datetime
+import json
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+# --- 持久化 (SQLite + WAL) ---
+# 帳本一筆一列 append，不再每次存檔都複製整本；
+# 帳戶 / 房貸 / 固定收支 / 匯率 / 分類 以 (kind, name) 一項一列 upsert。
+# 全部資料以 user 分區；整個 process 共用一個 Store (連線池)，每個使用者拿 for_user() 的視圖。
+# balance_snapshots 與帳本同一個 transaction 維護
+
+DB_PATH = os.environ.get("ASSETFLOW_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "assetflow.db"))
+
+LEDGER_COLS = ["日期", "帳戶", "類型", "分類", "金額", "幣別", "備註"]
+_SQL_COLS = ["date", "account", "type", "cat", "amount", "curr", "note"]
+_INSERT = f"INSERT INTO ledger (user, {', '.join(_SQL_COLS)}) VALUES (?,?,?,?,?,?,?,?)"
+_UPSERT = ("INSERT INTO items (user, kind, name, value) VALUES (?,?,?,?) "
+           "ON CONFLICT(user, kind, name) DO UPDATE SET value=excluded.value")
+
+# 餘額快照：收入加、支出減 (轉帳不影響餘額，同 BalanceBook)
+FLOW_SIGN = {"收入": 1.0, "支出": -1.0}
+_SIGNED = "CASE type WHEN '收入' THEN amount WHEN '支出' THEN -amount ELSE 0 END"
+
+DEFAULT_USER = "default"
+POOL_SIZE = 8
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS ledger (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL DEFAULT 'default',
+    date TEXT NOT NULL,
+    account TEXT,
+    type TEXT,
+    cat TEXT,
+    amount REAL,
+    curr TEXT,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    user TEXT NOT NULL DEFAULT 'default',
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (user, kind, name)
+);
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    user TEXT NOT NULL,
+    account TEXT NOT NULL,
+    date TEXT NOT NULL,
+    flow REAL NOT NULL,
+    cum REAL NOT NULL,
+    PRIMARY KEY (user, account, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    user TEXT NOT NULL,
+    key TEXT NOT NULL,
+    ledger_id INTEGER,
+    PRIMARY KEY (user, key)
+);
+"""
+
+INDEXES = """
+DROP INDEX IF EXISTS ledger_date;
+CREATE INDEX IF NOT EXISTS ledger_user_date ON ledger(user, date);
+"""
+
+
+# JSON 不認得 date，存成 {"$date": "YYYY-MM-DD"}
+def _default(o):
+    if isinstance(o, datetime.date):
+        return {"$date": o.isoformat()}
+    if hasattr(o, "item"):  # numpy 純量
+        return o.item()
+    raise TypeError(f"無法序列化: {type(o)}")
+
+
+def _hook(d):
+    if len(d) == 1 and "$date" in d:
+        return datetime.date.fromisoformat(d["$date"])
+    return d
+
+
+def dumps(value):
+    return json.dumps(value, default=_default, ensure_ascii=False)
+
+
+def loads(text):
+    return json.loads(text, object_hook=_hook)
+
+
+def _row(rec):
+    return (pd.Timestamp(rec["日期"]).strftime("%Y-%m-%d"), rec["帳戶"], rec["類型"], rec["分類"],
+            float(rec["金額"]), rec["幣別"], rec.get("備註", ""))
+
+
+class Store:
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._conn() as conn:
+            new_snapshots = not conn.execute("SELECT 1 FROM sqlite_master WHERE name='balance_snapshots'").fetchone()
+            conn.executescript(TABLES)
+            self._migrate(conn)
+            conn.executescript(INDEXES)
+            users = [r[0] for r in conn.execute("SELECT DISTINCT user FROM ledger")] if new_snapshots else []
+        # 舊資料庫第一次有快照表：從帳本補建
+        for user in users:
+            self.rebuild_snapshots(user)
+
+    def _connect(self):
+        # autocommit；寫入自己開 transaction。WAL 下讀寫可並行，寫入由 SQLite 排隊 (timeout)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _tx(self):
+        # IMMEDIATE：一開始就拿寫入鎖，批次 id (MAX(id)+1 起連號) 才不會和別的連線交錯
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _migrate(self, conn):
+        # 舊版 (單一使用者) 資料庫：補 user 欄，資料歸 default
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(ledger)")]
+        if "user" not in cols:
+            conn.execute(f"ALTER TABLE ledger ADD COLUMN user TEXT NOT NULL DEFAULT '{DEFAULT_USER}'")
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(items)")]
+        if "user" not in cols:
+            conn.executescript(f"""
+                ALTER TABLE items RENAME TO items_v1;
+                {TABLES}
+                INSERT INTO items (user, kind, name, value) SELECT '{DEFAULT_USER}', kind, name, value FROM items_v1;
+                DROP TABLE items_v1;
+            """)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    def for_user(self, user):
+        return UserStore(self, user)
+
+    def users(self):
+        with self._conn() as conn:
+            rows = conn.execute("SELECT DISTINCT user FROM items WHERE kind='meta' ORDER BY user").fetchall()
+        return [r[0] for r in rows]
+
+    # ---- 帳本 ----
+    def load_ledger(self, user):
+        with self._conn() as conn:
+            df = pd.read_sql_query(f"SELECT id, {', '.join(_SQL_COLS)} FROM ledger WHERE user=? ORDER BY id DESC",
+                                   conn, params=(user,), index_col="id")
+        df.columns = LEDGER_COLS
+        df.index.name = None
+        return schema.typed(df)
+
+    def append(self, user, rec):
+        with self._tx() as conn:
+            row = _row(rec)
+            self._apply_flows(conn, user, [(row[1], row[0], FLOW_SIGN.get(row[2], 0.0) * row[4])])
+            return conn.execute(_INSERT, (user,) + row).lastrowid
+
+    def _insert_frame(self, conn, user, df):
+        dates = pd.to_datetime(pd.Series(df["日期"].to_numpy())).dt.strftime("%Y-%m-%d")
+        rows = zip([user] * len(df), dates.tolist(), df["帳戶"].tolist(), df["類型"].tolist(), df["分類"].tolist(),
+                   df["金額"].astype(float).tolist(), df["幣別"].tolist(), df["備註"].fillna("").tolist())
+        first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM ledger").fetchone()[0]
+        conn.executemany(_INSERT, rows)
+        signed = df["金額"].astype(float).to_numpy() * df["類型"].map(FLOW_SIGN).fillna(0.0).to_numpy()
+        flows = pd.DataFrame({"account": df["帳戶"].to_numpy(), "date": dates.to_numpy(), "amount": signed})
+        self._apply_flows(conn, user, flows.groupby(["account", "date"], sort=False)["amount"].sum().reset_index().itertuples(index=False))
+        return list(range(first, first + len(df)))
+
+    def append_frame(self, user, df):
+        # 批次匯入：一個 transaction 內 executemany，回傳連號 id
+        if df.empty:
+            return []
+        with self._tx() as conn:
+            return self._insert_frame(conn, user, df)
+
+    def append_once(self, user, df, keys):
+        # 冪等入帳 (排程)：每列一個 key，已入帳過的 key 略過；檢查與寫入同一個 transaction。
+        # 回傳 (新 id, 各列是否寫入)
+        keys = list(keys)
+        if not keys:
+            return [], np.zeros(0, dtype=bool)
+        with self._tx() as conn:
+            seen = {r[0] for r in conn.execute(
+                "SELECT key FROM postings WHERE user=? AND key IN (SELECT value FROM json_each(?))",
+                (user, json.dumps(keys)))}
+            keep = np.array([k not in seen for k in keys], dtype=bool)
+            if not keep.any():
+                return [], keep
+            ids = self._insert_frame(conn, user, df[keep])
+            conn.executemany("INSERT INTO postings (user, key, ledger_id) VALUES (?,?,?)",
+                             zip([user] * len(ids), [k for k, ok in zip(keys, keep) if ok], ids))
+        return ids, keep
+
+    def _old_flow(self, conn, user, rid):
+        row = conn.execute(f"SELECT account, date, -({_SIGNED}) FROM ledger WHERE id=? AND user=?", (int(rid), user)).fetchone()
+        return [row] if row else []
+
+    def update(self, user, rid, rec):
+        with self._tx() as conn:
+            row = _row(rec)
+            self._apply_flows(conn, user, self._old_flow(conn, user, rid) + [(row[1], row[0], FLOW_SIGN.get(row[2], 0.0) * row[4])])
+            conn.execute(f"UPDATE ledger SET {', '.join(c + '=?' for c in _SQL_COLS)} WHERE id=? AND user=?",
+                         row + (int(rid), user))
+
+    def delete(self, user, rid):
+        with self._tx() as conn:
+            self._apply_flows(conn, user, self._old_flow(conn, user, rid))
+            conn.execute("DELETE FROM ledger WHERE id=? AND user=?", (int(rid), user))
+
+    # ---- 餘額快照 (帳戶 × 日 的淨流入與累計) ----
+    def _apply_flows(self, conn, user, flows):
+        # flows: (帳戶, 日期, 有號金額)。每個帳戶只從受影響的最早日期往後重算累計，之前的快照不動
+        by_acct = {}
+        for account, date, amount in flows:
+            if amount:
+                by_acct.setdefault(account, {}).setdefault(date, 0.0)
+                by_acct[account][date] += amount
+        for account, delta in by_acct.items():
+            start = min(delta)
+            base = conn.execute("SELECT cum FROM balance_snapshots WHERE user=? AND account=? AND date<? ORDER BY date DESC LIMIT 1",
+                                (user, account, start)).fetchone()
+            tail = dict(conn.execute("SELECT date, flow FROM balance_snapshots WHERE user=? AND account=? AND date>=?",
+                                     (user, account, start)).fetchall())
+            for date, amount in delta.items():
+                tail[date] = tail.get(date, 0.0) + amount
+            dates = sorted(tail)
+            cum = (base[0] if base else 0.0) + np.cumsum([tail[d] for d in dates])
+            conn.execute("DELETE FROM balance_snapshots WHERE user=? AND account=? AND date>=?", (user, account, start))
+            conn.executemany("INSERT INTO balance_snapshots (user, account, date, flow, cum) VALUES (?,?,?,?,?)",
+                             zip([user] * len(dates), [account] * len(dates), dates, [tail[d] for d in dates], cum.tolist()))
+
+    def rebuild_snapshots(self, user):
+        # 從帳本一次 GROUP BY 重算 (舊資料庫補建、或檢查不一致時)
+        with self._tx() as conn:
+            df = pd.read_sql_query(f"SELECT account, date, SUM({_SIGNED}) AS flow FROM ledger WHERE user=? "
+                                   "GROUP BY account, date ORDER BY account, date", conn, params=(user,))
+            df["cum"] = df.groupby("account")["flow"].cumsum()
+            conn.execute("DELETE FROM balance_snapshots WHERE user=?", (user,))
+            conn.executemany("INSERT INTO balance_snapshots (user, account, date, flow, cum) VALUES (?,?,?,?,?)",
+                             zip([user] * len(df), df["account"].tolist(), df["date"].tolist(), df["flow"].tolist(), df["cum"].tolist()))
+
+    def load_snapshots(self, user):
+        with self._conn() as conn:
+            return pd.read_sql_query("SELECT account, date, flow, cum FROM balance_snapshots WHERE user=? ORDER BY account, date",
+                                     conn, params=(user,))
+
+    # ---- 帳戶 / 房貸 / 固定收支 / 匯率 / 分類 ----
+    def load_items(self, user, kind):
+        with self._conn() as conn:
+            rows = conn.execute("SELECT name, value FROM items WHERE user=? AND kind=? ORDER BY rowid", (user, kind)).fetchall()
+        return {name: loads(value) for name, value in rows}
+
+    def put_item(self, user, kind, name, value):
+        with self._conn() as conn:
+            conn.execute(_UPSERT, (user, kind, name, dumps(value)))
+
+    def put_items(self, user, kind, mapping):
+        with self._tx() as conn:
+            conn.executemany(_UPSERT, [(user, kind, k, dumps(v)) for k, v in mapping.items()])
+
+    def delete_item(self, user, kind, name):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM items WHERE user=? AND kind=? AND name=?", (user, kind, name))
+
+    def has_items(self, user, kind):
+        with self._conn() as conn:
+            return conn.execute("SELECT 1 FROM items WHERE user=? AND kind=? LIMIT 1", (user, kind)).fetchone() is not None
+
+
+class UserStore:
+    # 綁定單一使用者的視圖；頁面只拿得到自己的分區
+    def __init__(self, store, user):
+        self.store = store
+        self.user = user
+
+    def load_ledger(self):
+        return self.store.load_ledger(self.user)
+
+    def append(self, rec):
+        return self.store.append(self.user, rec)
+
+    def append_frame(self, df):
+        return self.store.append_frame(self.user, df)
+
+    def append_once(self, df, keys):
+        return self.store.append_once(self.user, df, keys)
+
+    def load_snapshots(self):
+        return self.store.load_snapshots(self.user)
+
+    def rebuild_snapshots(self):
+        self.store.rebuild_snapshots(self.user)
+
+    def update(self, rid, rec):
+        self.store.update(self.user, rid, rec)
+
+    def delete(self, rid):
+        self.store.delete(self.user, rid)
+
+    def load_items(self, kind):
+        return self.store.load_items(self.user, kind)
+
+    def put_item(self, kind, name, value):
+        self.store.put_item(self.user, kind, name, value)
+
+    def put_items(self, kind, mapping):
+        self.store.put_items(self.user, kind, mapping)
+
+    def delete_item(self, kind, name):
+        self.store.delete_item(self.user, kind, name)
+
+    def has_items(self, kind):
+        return self.store.has_items(self.user, kind)
@@ -0,0 +1,42 @@
+import html
+
+import numpy as np
+
+# --- 交易清單 HTML ---
+# 一次把整頁卡片組成單一 HTML 區塊，取代每筆一個 st.markdown
+
+PAGE_SIZE = 50
+
+_CARD = ('<div class="tx-card"><div class="tx-left"><div class="tx-icon">{}</div><div>'
+         '<div class="tx-title">{}</div><div class="tx-sub">{}</div></div></div>'
+         '<div class="tx-amt {}">{} {} {}</div></div>')
+
+
+def _esc(values):
+    return [html.escape(str(v)) for v in values]
+
+
+def cards_html(df, show_date=False):
+    if df.empty:
+        return ""
+    cat = df["分類"].astype(str).to_numpy()
+    titles = _esc(df["分類"])
+    is_inc = (df["類型"] == "收入").to_numpy()
+    icons = np.select([cat == "房貸", np.isin(cat, ["餐飲", "食品"])], ["🏠", "🍜"], "💰")
+    colors = np.where(is_inc, "c-green", "c-red")
+    signs = np.where(is_inc, "+", "-")
+    subs = [f"{a} • {n}" for a, n in zip(_esc(df["帳戶"]), _esc(df["備註"]))]
+    if show_date:
+        dates = [d.strftime("%m/%d") for d in df["日期"]]
+        subs = [f"{d} • {s}" for d, s in zip(dates, subs)]
+    amts = [f"{a:,.0f}" for a in df["金額"].to_numpy(dtype=np.float64)]
+    return "".join(_CARD.format(*row) for row in zip(icons, titles, subs, colors, signs, _esc(df["幣別"]), amts))
+
+
+def page_count(n, page_size=PAGE_SIZE):
+    return max((n + page_size - 1) // page_size, 1)
+
+
+def page_slice(df, page, page_size=PAGE_SIZE):
+    page = min(max(page, 0), page_count(len(df), page_size) - 1)
+    return df.iloc[page * page_size:(page + 1) * page_size], page
@@ -0,0 +1,63 @@
+import altair as alt
+import streamlit as st
+
+import analytics
+import fx
+import profiling
+import state
+
+
+# 分析圖表 spec：cube 版本與篩選條件不變就直接重用
+@st.cache_data(max_entries=64)
+def analysis_specs(cube_token, cube_version, gran, start, end, _cube):
+    with profiling.section("分析 groupby"):
+        df = _cube.query(gran, start, end)
+        chart_data = df[df['類型']=='支出'].groupby('分類', as_index=False)[fx.TWD_COL].sum()
+        trend = df.groupby(['期間', '類型'], as_index=False)[fx.TWD_COL].sum()
+    with profiling.section("分析 圖表"):
+        return _specs(chart_data, trend, gran)
+
+
+def _specs(chart_data, trend, gran):
+    pie = None
+    if not chart_data.empty:
+        base = alt.Chart(chart_data).encode(theta=alt.Theta(fx.TWD_COL, stack=True))
+        pie = base.mark_arc(innerRadius=60).encode(
+            color=alt.Color("分類", scale=alt.Scale(scheme='tableau20')),
+            order=alt.Order(fx.TWD_COL, sort="descending"),
+            tooltip=["分類", fx.TWD_COL]
+        ).to_dict()
+    bar = alt.Chart(trend).mark_bar().encode(
+        x=alt.X('期間:T', title=gran), y=fx.TWD_COL,
+        color=alt.Color('類型', scale=alt.Scale(range=['#32D74B', '#FF453A'])),
+        column='類型'
+    ).to_dict()
+    return pie, bar
+
+
+# ==========================================
+# 📊 分析
+# ==========================================
+def render():
+    st.subheader("收支分析")
+    c_g, c_fx, c_r = st.columns([2, 2, 3])
+    gran_label = c_g.radio("粒度", list(analytics.GRANULARITIES), index=2, horizontal=True)
+    fx_view = c_fx.radio("匯率", ["目前", "歷史"], horizontal=True, key="fx_view_an",
+                         help="歷史：以交易當日匯率換算 (rates/*.csv)")
+    cube = state.get_cube(hist=fx_view == "歷史")
+    span = cube.span()
+    if span is None:
+        st.info("無資料")
+    else:
+        rng = c_r.date_input("期間", span)
+        start, end = (rng[0], rng[-1]) if isinstance(rng, (list, tuple)) and rng else span
+        pie, bar = analysis_specs(cube.token, cube.version, analytics.GRANULARITIES[gran_label], start, end, cube)
+
+        st.markdown("### 支出分佈")
+        if pie is not None:
+            st.vega_lite_chart(pie, use_container_width=True)
+        else:
+            st.info("尚無支出")
+        
+        st.markdown("### 收支趨勢")
+        st.vega_lite_chart(bar, use_container_width=True)
@@ -0,0 +1,241 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+from dateutil.relativedelta import relativedelta
+
+import forecast
+import mortgage
+import portfolio
+import profiling
+import state
+
+
+# ==========================================
+# 💳 資產
+# ==========================================
+def render():
+    store = state.get_store()
+    # 總資產計算
+    c_fx, c_fd = st.columns(2)
+    fx_view = c_fx.radio("匯率", ["目前匯率", "歷史匯率"], horizontal=True, key="fx_view_as")
+    view_rates = st.session_state['rates']
+    if fx_view == "歷史匯率":
+        fx_date = c_fd.date_input("匯率日", datetime.date.today(), key="fx_date_as",
+                                  help="餘額、持股、股價與房貸都是今天的，只有匯率換成這一天的")
+        view_rates = state.get_rate_table().rates_on(fx_date, st.session_state['rates'])
+
+    total_asset = 0
+    total_debt = 0
+    with profiling.section("資產 帳戶餘額"):
+        book = state.get_balances()
+        acct_bal = {name: book.balance(name, info['balance']) for name, info in st.session_state['accounts'].items()}
+        for name, info in st.session_state['accounts'].items():
+            twd = acct_bal[name] * view_rates.get(info['currency'], 1.0)
+            if twd >= 0: total_asset += twd
+            else: total_debt += abs(twd)
+    
+    with profiling.section("資產 股票估值"):
+        pf = state.get_portfolio(hist=fx_view == "歷史匯率")
+        stock_value = pf.value_at(view_rates)
+    total_asset += stock_value
+
+    loan_debt = sum([l['remaining'] for l in st.session_state['loans'].values()])
+    total_debt += loan_debt
+    home_asset = sum([l['total'] for l in st.session_state['loans'].values()])
+    total_asset += home_asset
+    
+    st.markdown(f"""
+    <div style="background: linear-gradient(135deg, #1C1C1E 0%, #2C2C2E 100%); padding: 20px; border-radius: 12px; margin-bottom: 20px; border: 1px solid #333;">
+        <div style="color:#888; font-size:14px;">淨資產</div>
+        <div style="color:white; font-size:32px; font-weight:bold;">${total_asset - total_debt:,.0f}</div>
+        <div style="display:flex; justify-content:space-between; margin-top:10px; font-size:13px; color:#AAA;">
+            <span>資產: ${total_asset:,.0f}</span>
+            <span>負債: ${total_debt:,.0f}</span>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # 淨資產走勢：快照已算好累計，這裡只取區間、抽樣後交給 vega-lite (不載入 altair)
+    with profiling.section("資產 淨資產走勢"):
+        nw = state.get_networth(hist=fx_view == "歷史匯率")
+    span = st.radio("區間", ["3個月", "1年", "5年", "全部"], index=1, horizontal=True, key="nw_span")
+    if span != "全部":
+        since = pd.Timestamp.today().normalize() - pd.DateOffset(months={"3個月": 3, "1年": 12, "5年": 60}[span])
+        nw = nw[nw.index >= since]
+    if len(nw) > 1500:
+        nw = nw.iloc[::-(-len(nw) // 1500)]
+    if len(nw):
+        long = nw.reset_index().melt("日期", ["淨資產", "帳戶", "股票", "房貸"], "項目", "TWD")
+        long["日期"] = long["日期"].dt.strftime("%Y-%m-%d")
+        st.vega_lite_chart(long, {
+            "mark": {"type": "line", "interpolate": "step-after"},
+            "encoding": {
+                "x": {"field": "日期", "type": "temporal", "title": None},
+                "y": {"field": "TWD", "type": "quantitative", "title": None},
+                "color": {"field": "項目", "type": "nominal", "sort": ["淨資產", "帳戶", "股票", "房貸"]},
+                "strokeWidth": {"condition": {"test": "datum['項目'] === '淨資產'", "value": 2.5}, "value": 1},
+            },
+        }, use_container_width=True)
+
+    # 1. 房貸區
+    st.markdown("#### 🏠 房貸智慧管家")
+    with st.expander("➕ 新增/編輯房貸"):
+        l_name = st.text_input("名稱", "新房貸")
+        l_total = st.number_input("總額", 10000000)
+        l_rate = st.number_input("利率", 2.53)
+        l_year = st.number_input("年限", 30)
+        l_grace = st.number_input("寬限期", 2)
+        if st.button("建立/更新"):
+            st.session_state['loans'][l_name] = {
+                "total": l_total, "rate": l_rate, "years": l_year, "grace_period": l_grace,
+                "start_date": datetime.date.today(), "remaining": l_total, "paid_principal": 0
+            }
+            store.put_item('loans', l_name, st.session_state['loans'][l_name])
+            st.rerun()
+
+    for name, info in st.session_state['loans'].items():
+        prog = 1 - (info['remaining'] / info['total'])
+        next_m = datetime.date.today() + relativedelta(months=1)
+        p, i, pr, s = mortgage.split(info, next_m)
+        
+        with st.expander(f"{name} (剩餘 ${info['remaining']:,.0f})"):
+            st.progress(prog)
+            st.caption(f"進度: {prog*100:.1f}% | 下期: {s}")
+            st.write(f"下月應繳: **${p:,.0f}** (利息 ${i:,.0f})")
+
+            acct_opts = ["(不自動扣款)"] + list(st.session_state['accounts'].keys())
+            c_ap, c_ad, c_ab = st.columns([2, 2, 1])
+            ap_acct = c_ap.selectbox("自動扣款帳戶", acct_opts, index=acct_opts.index(info['autopay']) if info.get('autopay') in acct_opts else 0, key=f"ap_a_{name}")
+            ap_day = c_ad.number_input("扣款日", 1, 31, int(info.get('autopay_day', info['start_date'].day)), key=f"ap_d_{name}")
+            if c_ab.button("設定", key=f"ap_{name}"):
+                info['autopay'] = None if ap_acct == acct_opts[0] else ap_acct
+                info['autopay_day'] = int(ap_day)
+                store.put_item('loans', name, info)
+                state.run_scheduler()
+                st.rerun()
+
+            c_rd, c_rr, c_rb = st.columns([2, 2, 1])
+            r_date = c_rd.date_input("利率調整日", datetime.date.today(), key=f"rc_d_{name}")
+            r_rate = c_rr.number_input("新利率", value=float(info['rate']), key=f"rc_r_{name}")
+            if c_rb.button("調整", key=f"rc_{name}"):
+                info.setdefault('rate_changes', []).append({"date": r_date, "rate": r_rate})
+                store.put_item('loans', name, info)
+                st.rerun()
+
+            sched = mortgage.schedule(info)
+            if st.checkbox("攤還表", key=f"sch_{name}"):
+                st.dataframe(pd.DataFrame({
+                    "月份": sched['month'].astype(str), "月付": sched['payment'], "利息": sched['interest'],
+                    "本金": sched['principal'], "提前還款": sched['prepay'], "餘額": sched['balance'],
+                }).style.format("{:,.0f}", subset=["月付", "利息", "本金", "提前還款", "餘額"]), hide_index=True)
+
+            x_text = st.text_input("每年多還 (逗號分隔)", "0, 100000, 300000, 500000", key=f"pp_{name}")
+            try:
+                xs = [float(x) for x in x_text.replace("，", ",").split(",") if x.strip()]
+            except ValueError:
+                xs = []
+                st.warning("請輸入數字")
+            if xs:
+                res = mortgage.payoff_scenarios(info, xs, datetime.date.today())
+                st.dataframe(pd.DataFrame({
+                    "每年多還": res['prepay'], "還清月份": res['payoff_month'].astype(str),
+                    "剩餘月數": res['months_left'], "總利息": res['interest'],
+                }).style.format("{:,.0f}", subset=["每年多還", "總利息"]), hide_index=True)
+            if st.button("刪除", key=f"del_l_{name}"):
+                del st.session_state['loans'][name]
+                store.delete_item('loans', name)
+                st.rerun()
+
+    # 2. 股票區
+    st.markdown("#### 📈 股票")
+    summ = pf.summary()
+    if len(summ):
+        last = pf.daily().iloc[-1]
+        c_v, c_u, c_r = st.columns(3)
+        c_v.metric("市值", f"${stock_value:,.0f}")
+        c_u.metric("未實現損益", f"${last['未實現損益']:,.0f}")
+        c_r.metric("已實現損益", f"${last['已實現損益']:,.0f}")
+        st.dataframe(summ.style.format("{:,.0f}", subset=["市值(TWD)", "成本(TWD)", "損益(TWD)"])
+                     .format("{:,.2f}", subset=["持有股數", "目前市價"]), hide_index=True)
+    with st.expander("➕ 買進/賣出"):
+        c_t, c_n, c_c = st.columns(3)
+        s_tick = c_t.text_input("代號", key="lot_tick").strip().upper()
+        held = st.session_state['stocks'].get(s_tick, {})
+        s_name = c_n.text_input("名稱", held.get('name', ""), key=f"lot_name_{s_tick}")
+        currs = list(st.session_state['rates'])
+        s_curr = c_c.selectbox("幣別", currs, index=currs.index(held.get('currency', "TWD")) if held.get('currency', "TWD") in currs else 0,
+                               key=f"lot_curr_{s_tick}", disabled=bool(held))
+        c_s, c_d, c_q, c_p = st.columns(4)
+        s_side = c_s.radio("方向", ["買進", "賣出"], horizontal=True, key="lot_side")
+        s_date = c_d.date_input("日期", datetime.date.today(), key="lot_date")
+        s_qty = c_q.number_input("股數", min_value=0.0, step=1.0, key="lot_qty")
+        s_px = c_p.number_input("成交價", min_value=0.0, key="lot_px")
+        owned = sum(l['qty'] for l in held.get('lots', []))
+        if st.button("記錄", disabled=not s_tick or s_qty <= 0):
+            if s_side == "賣出" and s_qty > owned:
+                st.error(f"持有 {owned:,.0f} 股，不足賣出")
+            else:
+                state.add_lot(s_tick, s_name or s_tick, s_curr,
+                              {"date": s_date, "qty": s_qty if s_side == "買進" else -s_qty, "price": s_px})
+                st.rerun()
+        st.caption(f"價格歷史：{portfolio.PRICES_DIR}/<代號>.parquet 或 .csv (date,close)；沒有價格檔時用最近成交價")
+
+    # 3. 蒙地卡羅推估
+    st.markdown("#### 🔮 未來推估")
+    with st.expander("⚙️ 模擬設定"):
+        c_p, c_y, c_l = st.columns(3)
+        f_paths = c_p.select_slider("路徑數", [1000, 2000, 5000, 10000, 20000], 5000, key="fc_paths")
+        f_years = c_y.number_input("年數", 1, 40, 30, key="fc_years")
+        f_look = c_l.number_input("取樣最近幾個月", 6, 120, 36, key="fc_look")
+        c_sg, c_ig, c_rv = st.columns(3)
+        f_sg = c_sg.number_input("支出年成長 %", value=2.0, step=0.5, key="fc_sg")
+        f_ig = c_ig.number_input("收入年成長 %", value=2.0, step=0.5, key="fc_ig")
+        f_rv = c_rv.number_input("利率年波動 (百分點)", value=0.5, step=0.1, key="fc_rv")
+        c_sr, c_sv, c_pp = st.columns(3)
+        f_sr = c_sr.number_input("股票年報酬 %", value=5.0, step=0.5, key="fc_sr")
+        f_sv = c_sv.number_input("股票年波動 %", value=15.0, step=1.0, key="fc_sv")
+        f_pp = c_pp.number_input("每年多還房貸", value=0.0, step=100000.0, key="fc_pp")
+        if st.button("開始模擬", key="fc_run"):
+            with st.spinner("模擬中…"):
+                state.run_forecast(f_paths, f_years, f_look, spend_growth=f_sg, income_growth=f_ig, rate_vol=f_rv,
+                                   stock_return=f_sr, stock_vol=f_sv, prepay=f_pp)
+    fc = st.session_state.get('forecast')
+    if fc is not None:
+        bands = fc['net_worth'].reset_index()
+        bands["月份"] = bands["月份"].dt.strftime("%Y-%m-%d")
+        x = {"field": "月份", "type": "temporal", "title": None}
+        st.vega_lite_chart(bands, {"layer": [
+            {"mark": {"type": "area", "opacity": 0.2}, "encoding": {"x": x, "y": {"field": "P5", "type": "quantitative", "title": None}, "y2": {"field": "P95"}}},
+            {"mark": {"type": "area", "opacity": 0.35}, "encoding": {"x": x, "y": {"field": "P25", "type": "quantitative"}, "y2": {"field": "P75"}}},
+            {"mark": "line", "encoding": {"x": x, "y": {"field": "P50", "type": "quantitative"}}},
+        ]}, use_container_width=True)
+        st.caption(f"淨資產 P5–P95 / P25–P75 / 中位數 • {fc['paths']:,} 條路徑 • 現金曾低於 0 的機率 {fc['short']:.0%}")
+        if len(fc['payoff']):
+            st.dataframe(fc['payoff'].style.format("{:.0%}", subset=["期間內還清"])
+                         .format(lambda m: f"{m:,.0f} 個月" if m != float("inf") else "未還清", subset=[f"P{q}" for q in forecast.PERCENTILES]))
+
+    # 4. 帳戶區
+    st.markdown("#### 💳 帳戶列表")
+    with st.expander("➕ 新增帳戶"):
+        n_n = st.text_input("名稱")
+        n_c = st.selectbox("幣別", ["TWD", "VND", "USD"])
+        n_b = st.number_input("餘額", 0)
+        if st.button("建立"):
+            st.session_state['accounts'][n_n] = {"type":"一般", "currency":n_c, "balance":n_b, "icon":"💰"}
+            store.put_item('accounts', n_n, st.session_state['accounts'][n_n])
+            st.rerun()
+
+    for name, info in st.session_state['accounts'].items():
+        bal = acct_bal[name]
+        
+        with st.expander(f"{info.get('icon','')} {name} : {info['currency']} {bal:,.0f}"):
+            new_bal = st.number_input("修正餘額", value=float(info['balance']), key=f"ed_{name}")
+            if st.button("更新", key=f"up_{name}"):
+                st.session_state['accounts'][name]['balance'] = new_bal
+                store.put_item('accounts', name, st.session_state['accounts'][name])
+                st.rerun()
+            if st.button("刪除", key=f"dl_{name}"):
+                del st.session_state['accounts'][name]
+                store.delete_item('accounts', name)
+                st.rerun()
@@ -0,0 +1,150 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import importer
+import mortgage
+import scheduler
+import state
+
+
+# ==========================================
+# ➕ 記帳 (含固定收支 & 房貸)
+# ==========================================
+def render():
+    store = state.get_store()
+    st.subheader("新增交易")
+    sub_t1, sub_t2, sub_t3 = st.tabs(["📝 一般記帳", "🔄 固定收支", "📥 匯入"])
+    
+    with sub_t1:
+        tx_type = st.radio("類型", ["支出", "收入", "轉帳"], horizontal=True)
+        c1, c2 = st.columns(2)
+        # 預設使用選中的日期
+        tx_date = c1.date_input("日期", st.session_state.selected_date, key="add_date")
+        
+        acct_opts = list(st.session_state['accounts'].keys())
+        acct_name = c2.selectbox("帳戶", acct_opts) if acct_opts else None
+        
+        if acct_name:
+            curr = st.session_state['accounts'][acct_name]['currency']
+            cats = st.session_state['categories']['支出'] if tx_type=="支出" else st.session_state['categories']['收入']
+            tx_cat = st.selectbox("分類", cats)
+            
+            # 房貸智慧偵測
+            default_amt = 0.0
+            loan_obj = None
+            loan_key = None
+            std_pay = 0
+            
+            if tx_cat == "房貸" and tx_type == "支出":
+                loan_opts = list(st.session_state['loans'].keys())
+                if loan_opts:
+                    loan_key = st.selectbox("房貸契約", loan_opts)
+                    loan_obj = st.session_state['loans'][loan_key]
+                    pay, inte, prin, stat = mortgage.calculate_mortgage_split(loan_obj, tx_date)
+                    st.info(f"📊 本期 ({stat}): ${pay:,.0f} (利息 ${inte:,.0f})")
+                    default_amt = float(int(pay))
+                    std_pay = pay
+
+            tx_amt = st.number_input(f"金額 ({curr})", value=default_amt, step=1000.0)
+            tx_note = st.text_input("備註")
+            
+            if loan_obj and tx_amt > std_pay and std_pay > 0:
+                st.warning(f"🔥 超額還款！多出的 ${tx_amt - std_pay:,.0f} 將償還本金")
+
+            if st.button("確認儲存", type="primary", use_container_width=True):
+                new_rec = {"日期": tx_date, "帳戶": acct_name, "類型": tx_type, "分類": tx_cat, "金額": tx_amt, "幣別": curr, "備註": tx_note}
+                state.add_records([new_rec])
+                
+                if loan_obj:
+                    p, i, p_std, s = mortgage.calculate_mortgage_split(loan_obj, tx_date)
+                    actual_prin = p_std + (tx_amt - p)
+                    if tx_amt > p > 0:
+                        # 超額部分記為提前還款，攤還表據此重算
+                        st.session_state['loans'][loan_key].setdefault('prepayments', []).append({"date": tx_date, "amount": tx_amt - p})
+                    if actual_prin > 0:
+                        st.session_state['loans'][loan_key]['remaining'] -= actual_prin
+                        store.put_item('loans', loan_key, st.session_state['loans'][loan_key])
+                        st.toast(f"本金減少 ${actual_prin:,.0f}")
+                st.success("已記帳")
+
+    with sub_t2:
+        st.caption("有排程的項目在開啟 App 時自動補記；按「入帳」記選中日期所屬的這一期 (同一期只記一次)")
+        acct_opts = list(st.session_state['accounts'].keys())
+        for item in st.session_state['recurring']:
+            c_info, c_btn = st.columns([3, 1])
+            c_info.write(f"**{item['name']}** - {item['curr']} {item['amt']}")
+            c_info.caption(scheduler.describe(item))
+            if c_btn.button("入帳", key=f"rec_{item['name']}"):
+                d = st.session_state.selected_date
+                acct = item.get('account') or (acct_opts[0] if acct_opts else "")
+                batch = pd.DataFrame([{"日期": d, "帳戶": acct, "類型": item['type'], "分類": item['cat'], "金額": item['amt'],
+                                       "幣別": item['curr'], "備註": f"固定: {item['name']}", "key": scheduler.item_key(item, d)}])
+                if len(state.post_scheduled(batch)):
+                    st.success("OK")
+                else:
+                    st.info(f"{scheduler.period_label(item.get('freq', '月'), d)} 已入帳")
+
+        with st.expander("➕ 新增/編輯固定收支"):
+            names = [it['name'] for it in st.session_state['recurring']]
+            pick = st.selectbox("項目", ["(新增)"] + names, key="rec_pick")
+            cur = next((it for it in st.session_state['recurring'] if it['name'] == pick), {})
+            c_n, c_a = st.columns(2)
+            r_name = c_n.text_input("名稱", cur.get('name', ""), key=f"rec_name_{pick}")
+            r_amt = c_a.number_input("金額", value=float(cur.get('amt', 0)), step=100.0, key=f"rec_amt_{pick}")
+            c_t, c_c, c_acct = st.columns(3)
+            r_type = c_t.radio("類型", ["支出", "收入"], index=["支出", "收入"].index(cur.get('type', "支出")), horizontal=True, key=f"rec_type_{pick}")
+            cats = st.session_state['categories'][r_type]
+            r_cat = c_c.selectbox("分類", cats, index=cats.index(cur['cat']) if cur.get('cat') in cats else 0, key=f"rec_cat_{pick}")
+            r_acct = c_acct.selectbox("帳戶", acct_opts, index=acct_opts.index(cur['account']) if cur.get('account') in acct_opts else 0, key=f"rec_acct_{pick}") if acct_opts else ""
+            c_f, c_d, c_s, c_e = st.columns(4)
+            freqs = list(scheduler.FREQS)
+            r_freq = c_f.selectbox("頻率", freqs, index=freqs.index(cur.get('freq', "月")), key=f"rec_freq_{pick}")
+            if r_freq == "週":
+                r_day = c_d.selectbox("星期", range(7), index=int(cur.get('day', 0)) % 7, format_func=lambda i: f"週{scheduler.WEEKDAYS[i]}", key=f"rec_wday_{pick}")
+            else:
+                r_day = c_d.number_input("日", 1, 31, int(cur.get('day', 1)), key=f"rec_day_{pick}")
+            r_start = c_s.date_input("開始", cur.get('start') or datetime.date.today(), key=f"rec_start_{pick}")
+            r_end = c_e.date_input("結束 (可空白)", cur.get('end'), key=f"rec_end_{pick}")
+            if st.button("儲存項目") and r_name:
+                curr = st.session_state['accounts'][r_acct]['currency'] if r_acct else cur.get('curr', "TWD")
+                item = {"name": r_name, "amt": r_amt, "type": r_type, "cat": r_cat, "curr": curr,
+                        "freq": r_freq, "day": int(r_day), "start": r_start, "end": r_end, "account": r_acct}
+                st.session_state['recurring'] = [it for it in st.session_state['recurring'] if it['name'] != r_name] + [item]
+                store.put_item('recurring', r_name, item)
+                posted = state.run_scheduler()
+                st.toast(f"已儲存，補記 {len(posted)} 筆")
+                st.rerun()
+
+    with sub_t3:
+        up = st.file_uploader("銀行對帳單 / CSV", type=["csv", "txt"])
+        if up is not None:
+            head = pd.read_csv(up, nrows=5, dtype=str)
+            up.seek(0)
+            st.dataframe(head, hide_index=True)
+            file_cols = ["(不使用)"] + list(head.columns)
+            mapping = {}
+            m_cols = st.columns(4)
+            for j, col in enumerate(importer.LEDGER_COLS):
+                guess = file_cols.index(col) if col in file_cols else 0
+                pick = m_cols[j % 4].selectbox(col, file_cols, index=guess, key=f"imp_{col}")
+                if pick != "(不使用)":
+                    mapping[col] = pick
+            acct_opts = list(st.session_state['accounts'].keys())
+            d_acct = st.selectbox("預設帳戶", acct_opts, key="imp_acct") if acct_opts else ""
+            d_curr = st.session_state['accounts'][d_acct]['currency'] if d_acct else "TWD"
+            st.caption("沒有「類型」欄時依金額正負判斷 (負數為支出)；沒有「幣別」欄時使用帳戶幣別")
+
+            if "日期" not in mapping or "金額" not in mapping:
+                st.warning("請至少對應「日期」與「金額」")
+            elif st.button("開始匯入", type="primary", use_container_width=True):
+                size = max(up.size, 1)
+                bar = st.progress(0.0, text="讀取中…")
+                stats = importer.run(
+                    up, mapping, {"帳戶": d_acct, "幣別": d_curr, "類型": ""}, st.session_state['rates'],
+                    st.session_state['data'], state.add_frame,
+                    progress=lambda s: bar.progress(min(up.tell() / size, 1.0), text=f"{s['rows']:,} 列 • {s['rows_per_sec']:,.0f} 列/秒"),
+                )
+                bar.progress(1.0, text="完成")
+                st.success(f"匯入 {stats['imported']:,} 筆 • 重複略過 {stats['duplicates']:,} • 無法解析 {stats['rejected']:,} • {stats['rows_per_sec']:,.0f} 列/秒")
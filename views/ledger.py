@@ -0,0 +1,121 @@
+import datetime
+
+import streamlit as st
+from dateutil.relativedelta import relativedelta
+
+import profiling
+import state
+import storage
+import txlist
+
+
+# ==========================================
+# 📅 帳本 (V20 週曆功能回歸！)
+# ==========================================
+def render():
+    
+    # 1. 週曆控制區
+    view_date = st.session_state.view_date
+    # 算出本週一
+    start_of_week = view_date - datetime.timedelta(days=view_date.weekday())
+    
+    col_prev, col_label, col_next = st.columns([1, 4, 1])
+    if col_prev.button("◀", key="prev_week"):
+        st.session_state.view_date -= datetime.timedelta(days=7)
+        st.rerun()
+    
+    with col_label:
+        st.markdown(f"<div class='week-header'>{start_of_week.strftime('%Y 年 %m 月')}</div>", unsafe_allow_html=True)
+        
+    if col_next.button("▶", key="next_week"):
+        st.session_state.view_date += datetime.timedelta(days=7)
+        st.rerun()
+
+    # 2. 七天按鈕 (模仿天天記帳)
+    days_cols = st.columns(7)
+    week_days_name = ["週一", "週二", "週三", "週四", "週五", "週六", "週日"]
+    date_idx = state.get_date_index()
+    week_inc, week_exp = date_idx.totals(start_of_week, 7)
+    
+    for i in range(7):
+        current_day = start_of_week + datetime.timedelta(days=i)
+        is_selected = (current_day == st.session_state.selected_date)
+        
+        # 按鈕標籤 (附當日收支小計)
+        label = f"{week_days_name[i]}\n{current_day.day}"
+        if week_inc[i]: label += f"\n+{week_inc[i]:,.0f}"
+        if week_exp[i]: label += f"\n-{week_exp[i]:,.0f}"
+        
+        # 使用不同樣式標示選中
+        btn_type = "primary" if is_selected else "secondary"
+        
+        if days_cols[i].button(label, key=f"day_{i}", use_container_width=True, type=btn_type):
+            st.session_state.selected_date = current_day
+            st.rerun()
+
+    st.markdown("---")
+
+    # 3. 當日統計
+    target_date = st.session_state.selected_date
+    df_day = st.session_state['data'].loc[date_idx.ids_on(target_date)]
+    day_inc, day_exp = (v[0] for v in date_idx.totals(target_date))
+    
+    # 統計卡片
+    c_s1, c_s2, c_s3 = st.columns(3)
+    c_s1.markdown(f'<div class="stat-box"><small style="color:#888">日期</small><br><b>{target_date.strftime("%m/%d")}</b></div>', unsafe_allow_html=True)
+    c_s2.markdown(f'<div class="stat-box"><small style="color:#888">收入</small><br><b class="c-green">+{day_inc:,.0f}</b></div>', unsafe_allow_html=True)
+    c_s3.markdown(f'<div class="stat-box"><small style="color:#888">支出</small><br><b class="c-red">-{day_exp:,.0f}</b></div>', unsafe_allow_html=True)
+
+    st.write("") # Spacer
+
+    # 4. 交易清單 (整頁一個 HTML 區塊，分頁顯示)
+    scope = st.radio("範圍", ["當日", "本週", "本月"], horizontal=True, label_visibility="collapsed", key="list_scope")
+    if scope == "當日":
+        df_list = df_day
+    else:
+        if scope == "本週":
+            lo, hi = start_of_week, start_of_week + datetime.timedelta(days=6)
+        else:
+            lo = target_date.replace(day=1)
+            hi = lo + relativedelta(months=1) - datetime.timedelta(days=1)
+        df_list = st.session_state['data'].loc[date_idx.ids_between(lo, hi, desc=True)]
+
+    if df_list.empty:
+        st.info("📭 點擊上方日期來記帳")
+    else:
+        n_pages = txlist.page_count(len(df_list))
+        page_key = (scope, target_date)
+        if st.session_state.get('list_page_key') != page_key:
+            st.session_state['list_page_key'] = page_key
+            st.session_state['list_page'] = 0
+        df_page, st.session_state['list_page'] = txlist.page_slice(df_list, st.session_state['list_page'])
+        with profiling.section("帳本 卡片"):
+            html = txlist.cards_html(df_page, show_date=scope != "當日")
+        st.markdown(html, unsafe_allow_html=True)
+
+        if n_pages > 1:
+            c_pp, c_pl, c_pn = st.columns([1, 4, 1])
+            if c_pp.button("◀", key="list_prev", disabled=st.session_state['list_page'] == 0):
+                st.session_state['list_page'] -= 1
+                st.rerun()
+            c_pl.markdown(f"<div style='text-align:center'>{st.session_state['list_page'] + 1} / {n_pages} • 共 {len(df_list):,} 筆</div>", unsafe_allow_html=True)
+            if c_pn.button("▶", key="list_next", disabled=st.session_state['list_page'] >= n_pages - 1):
+                st.session_state['list_page'] += 1
+                st.rerun()
+
+    if not df_day.empty:
+        with st.expander("✏️ 編輯 / 刪除"):
+            rid = st.selectbox("交易", df_day.index.tolist(),
+                               format_func=lambda r: f"{df_day.at[r, '分類']} • {df_day.at[r, '帳戶']} • {df_day.at[r, '幣別']} {df_day.at[r, '金額']:,.0f}")
+            row = df_day.loc[rid]
+            e_amt = st.number_input("金額", value=float(row['金額']), key=f"e_amt_{rid}")
+            e_note = st.text_input("備註", value=row['備註'], key=f"e_note_{rid}")
+            c_up, c_del = st.columns(2)
+            if c_up.button("更新", key="tx_update", use_container_width=True):
+                rec = {c: row[c] for c in storage.LEDGER_COLS}
+                rec.update({"金額": e_amt, "備註": e_note})
+                state.update_record(rid, rec)
+                st.rerun()
+            if c_del.button("刪除", key="tx_delete", use_container_width=True):
+                state.delete_record(rid)
+                st.rerun()
@@ -0,0 +1,58 @@
+import time
+
+import streamlit as st
+
+import state
+import txlist
+
+
+# ==========================================
+# 🔍 搜尋
+# ==========================================
+def render():
+    st.subheader("搜尋交易")
+    idx = state.get_search()
+    text = st.text_input("關鍵字 (備註)", key="q_text", placeholder="例：河粉、Netflix")
+    c_lo, c_hi, c_d = st.columns([1, 1, 2])
+    amt_lo = c_lo.number_input("金額下限", value=None, min_value=0.0, key="q_lo")
+    amt_hi = c_hi.number_input("金額上限", value=None, min_value=0.0, key="q_hi")
+    rng = c_d.date_input("日期範圍", (), key="q_dates")
+    dates = (rng[0] if len(rng) > 0 else None, rng[-1] if len(rng) > 1 else None)
+
+    # facet 選項旁的筆數：關鍵字 / 金額 / 日期條件下的分佈
+    t0 = time.perf_counter()
+    base = idx.query(text, amount=(amt_lo, amt_hi), dates=dates)
+    counts = idx.facet_counts(base)
+    c_a, c_c, c_t = st.columns(3)
+    facets = {}
+    for col, f in zip((c_a, c_c, c_t), ("帳戶", "分類", "類型")):
+        opts = sorted(v for v, n in counts[f].items() if n)
+        facets[f] = col.multiselect(f, opts, format_func=lambda v, f=f: f"{v} ({counts[f].get(v, 0):,})", key=f"q_{f}")
+
+    if not (text.strip() or any(facets.values()) or amt_lo is not None or amt_hi is not None or any(dates)):
+        st.info(f"輸入關鍵字或篩選條件 • 索引 {len(idx):,} 筆")
+        return
+    pos = idx.query(text, facets, (amt_lo, amt_hi), dates) if any(facets.values()) else base
+    ids = idx.result_ids(pos)
+    st.caption(f"找到 {len(ids):,} 筆 • {(time.perf_counter() - t0) * 1000:.0f} ms")
+    if not len(ids):
+        return
+
+    page_key = (text, str(facets), amt_lo, amt_hi, dates)
+    if st.session_state.get('search_page_key') != page_key:
+        st.session_state['search_page_key'] = page_key
+        st.session_state['search_page'] = 0
+    n_pages = txlist.page_count(len(ids))
+    page = min(max(st.session_state['search_page'], 0), n_pages - 1)
+    page_ids = ids[page * txlist.PAGE_SIZE:(page + 1) * txlist.PAGE_SIZE]
+    st.markdown(txlist.cards_html(st.session_state['data'].loc[page_ids], show_date=True), unsafe_allow_html=True)
+
+    if n_pages > 1:
+        c_pp, c_pl, c_pn = st.columns([1, 4, 1])
+        if c_pp.button("◀", key="search_prev", disabled=page == 0):
+            st.session_state['search_page'] = page - 1
+            st.rerun()
+        c_pl.markdown(f"<div style='text-align:center'>{page + 1} / {n_pages}</div>", unsafe_allow_html=True)
+        if c_pn.button("▶", key="search_next", disabled=page >= n_pages - 1):
+            st.session_state['search_page'] = page + 1
+            st.rerun()
@@ -0,0 +1,127 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+import balances
+import fx
+import networth
+import portfolio
+import profiling
+import schema
+import state
+import storage
+
+
+# === ⚙️ 設定 ===
+def render():
+    store = state.get_store()
+    st.subheader("設定")
+    with st.expander(f"👤 使用者：{state.current_user()}"):
+        users = state.get_pool().users()
+        c_us, c_un = st.columns(2)
+        pick = c_us.selectbox("切換至", users, index=users.index(state.current_user()) if state.current_user() in users else 0)
+        new_user = c_un.text_input("或新增使用者")
+        target = new_user.strip() or pick
+        if st.button("切換", disabled=target == state.current_user()):
+            state.switch_user(target)
+            st.rerun()
+    with st.expander("🏷️ 分類管理"):
+        new_cat = st.text_input("新增支出分類")
+        if st.button("新增"):
+            st.session_state['categories']['支出'].append(new_cat)
+            store.put_item('categories', '支出', st.session_state['categories']['支出'])
+            st.rerun()
+    with st.expander("🌍 匯率"):
+        vnd = st.number_input("1 VND =", value=st.session_state['rates']['VND'], format="%.5f")
+        if vnd != st.session_state['rates']['VND']:
+            st.session_state['rates']['VND'] = vnd
+            store.put_item('rates', 'VND', vnd)
+        table = state.get_rate_table()
+        if len(table):
+            st.caption("歷史匯率: " + "、".join(f"{c} {len(table.days[c]):,} 筆" for c in table.currencies()))
+        else:
+            st.caption("尚無歷史匯率 (rates/*.csv)")
+        c_hc, c_hf = st.columns([1, 3])
+        h_curr = c_hc.selectbox("幣別", [c for c in st.session_state['rates'] if c != "TWD"], key="hist_curr")
+        h_file = c_hf.file_uploader("歷史匯率 CSV (date,rate)", type=["csv"], key="hist_file")
+        if h_file is not None and st.button("匯入歷史匯率"):
+            hist = pd.read_csv(h_file, usecols=[0, 1])
+            os.makedirs(fx.RATES_DIR, exist_ok=True)
+            hist.to_csv(os.path.join(fx.RATES_DIR, f"{h_curr}.csv"), index=False, header=["date", "rate"])
+            state.get_rate_table.clear()
+            st.rerun()
+    with st.expander("📈 股價歷史"):
+        c_pt, c_pf = st.columns([1, 3])
+        p_tick = c_pt.text_input("代號", key="px_tick").strip().upper()
+        p_file = c_pf.file_uploader("股價 CSV / Parquet (date,close)", type=["csv", "parquet"], key="px_file")
+        if p_file is not None and p_tick and st.button("匯入股價"):
+            os.makedirs(portfolio.PRICES_DIR, exist_ok=True)
+            ext = os.path.splitext(p_file.name)[1].lower()
+            for other in (".csv", ".parquet"):
+                if other != ext and os.path.exists(os.path.join(portfolio.PRICES_DIR, p_tick + other)):
+                    os.remove(os.path.join(portfolio.PRICES_DIR, p_tick + other))
+            with open(os.path.join(portfolio.PRICES_DIR, p_tick + ext), "wb") as f:
+                f.write(p_file.getbuffer())
+            st.rerun()
+    with st.expander("🧮 餘額檢查"):
+        if st.button("從帳本重算並比對"):
+            diff = state.get_balances().verify(st.session_state['data'])
+            if diff:
+                for (acct, typ), (have, want) in diff.items():
+                    st.error(f"{acct} / {typ}: 累計 {have:,.2f} ≠ 重算 {want:,.2f}")
+                st.session_state['balances'] = balances.BalanceBook.from_frame(st.session_state['data'])
+                st.warning("已用重算結果覆蓋")
+            else:
+                st.success("一致")
+            snap_diff = state.get_snapshots().verify(st.session_state['data'])
+            if snap_diff:
+                for acct, gap in snap_diff.items():
+                    st.error(f"餘額快照 {acct}: 最大差額 {gap:,.2f}")
+                store.rebuild_snapshots()
+                st.session_state['snapshots'] = networth.Snapshots.from_store(store.load_snapshots())
+                st.warning("已從帳本重建餘額快照")
+
+    with st.expander("🧠 記憶體"):
+        # expander 收起來也會執行，所以按了才量；舊表示法只抽 10,000 列換算每列 bytes
+        if st.button("計算記憶體用量", key="mem_calc"):
+            data = st.session_state['data'][storage.LEDGER_COLS]
+            mem = schema.memory(data)
+            sample = data.sample(min(len(data), 10_000), random_state=0)
+            old_row = schema.memory(schema.legacy(sample)).at["合計", "bytes/列"]
+            per_row = mem.at["合計", "bytes/列"]
+            st.caption(f"{len(data):,} 筆 • {mem.at['合計', 'bytes'] / 2**20:,.1f} MB • 每列 {per_row:,.0f} bytes "
+                       f"(字串 / date 物件表示法約 {old_row:,.0f} bytes，{old_row / max(per_row, 1):.1f}×)")
+            st.dataframe(mem, use_container_width=True)
+
+    with st.expander("⏱️ 效能剖析"):
+        # 開關是整個 process 的：每次先對齊目前狀態，使用者切換時才改
+        st.session_state['prof_on'] = profiling.ENABLED
+        st.toggle("記錄各區段耗時", key="prof_on", on_change=lambda: profiling.set_enabled(st.session_state['prof_on']),
+                  help="本 process 所有 session 共用；也可用 --profile 或 ASSETFLOW_PROFILE=1 啟動")
+        rows = profiling.summary()
+        if not rows:
+            st.caption("尚無紀錄：開啟後切換頁面或操作幾次")
+        else:
+            st.dataframe(pd.DataFrame(rows).set_index("區段").style.format("{:,.1f}", subset=["平均", "p50", "p95", "最大", "合計"]),
+                         use_container_width=True)
+            # 每個區段一張耗時分佈圖 (ms)，刻度各自獨立
+            hist = pd.DataFrame([(name, v) for name, values in profiling.samples().items() for v in values],
+                                columns=["區段", "ms"])
+            st.vega_lite_chart(hist, {
+                "mark": "bar",
+                "encoding": {
+                    "facet": {"field": "區段", "type": "nominal", "columns": 3, "title": None,
+                              "sort": [r["區段"] for r in rows]},
+                    "x": {"field": "ms", "type": "quantitative", "bin": {"maxbins": 30}, "title": "ms"},
+                    "y": {"aggregate": "count", "type": "quantitative", "title": None},
+                },
+                "width": 180, "height": 90,
+                "resolve": {"scale": {"x": "independent", "y": "independent"}},
+            })
+            c_dl, c_rs = st.columns(2)
+            c_dl.download_button("匯出 JSON", profiling.export(), file_name="assetflow-profile.json",
+                                 mime="application/json", use_container_width=True)
+            if c_rs.button("清除紀錄", use_container_width=True):
+                profiling.reset()
+                st.rerun()